@@ -1,3 +1,12 @@
+import collections
+import mmap
+import operator
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
 class NodeClass:
     """Класс узла дерева выражения"""
     def __init__(self, value):
@@ -6,6 +15,21 @@ class NodeClass:
         self.right = None
 
 
+def _is_number(token):
+    """
+    Проверяет, является ли токен целым числом (возможно, со знаком)
+    
+    Args:
+        token (str): Токен выражения
+    
+    Returns:
+        bool: True, если токен - число
+    """
+    if token[0] in '+-':
+        return token[1:].isdigit()
+    return token.isdigit()
+
+
 def build_expression_tree(rpn_expression):
     """
     Строит дерево выражения из обратной польской записи
@@ -19,7 +43,7 @@ def build_expression_tree(rpn_expression):
     stack = []
     tokens = rpn_expression.split()
     for token in tokens:
-        if token.isdigit():
+        if _is_number(token):
             stack.append(NodeClass(int(token)))
         else:
             if token == '+':
@@ -56,7 +80,7 @@ def remove_additions(root):
     root.right = remove_additions(root.right)
     
     # Если текущий узел - операция сложения
-    if root.value == -1:
+    if root.value == -1 and root.left is not None:
         left_value = evaluate_tree(root.left)
         right_value = evaluate_tree(root.right)
         return NodeClass(left_value + right_value)
@@ -64,6 +88,82 @@ def remove_additions(root):
     return root
 
 
+# Коды операций и соответствующие им функции
+_OPERATIONS = {
+    -1: operator.add,
+    -2: operator.sub,
+    -3: operator.mul,
+    -4: operator.floordiv,
+}
+
+# Коды операций по символу и символы по коду
+_OPERATION_CODES = {'+': -1, '-': -2, '*': -3, '/': -4}
+_OPERATION_SYMBOLS = {code: symbol for symbol, code in _OPERATION_CODES.items()}
+
+
+def _fold_additions(root, need_value):
+    """
+    Один проход в обратном порядке: преобразует поддерево и одновременно
+    вычисляет его значение
+    
+    Значение поддерева вычисляется только тогда, когда оно понадобится
+    предку-сложению (need_value), иначе вместо него возвращается None.
+    Поддеревья вне сложений не вычисляются, как и в remove_additions,
+    поэтому ошибки (например, деление на ноль) возникают в тех же случаях.
+    Обход выполняется явным стеком и не ограничен глубиной рекурсии.
+    
+    Args:
+        root (NodeClass): Корень поддерева
+        need_value (bool): Нужно ли значение поддерева
+    
+    Returns:
+        tuple: Пара (новый корень поддерева, значение или None)
+    """
+    results = []
+    stack = [(root, need_value, False)]
+    while stack:
+        node, need, expanded = stack.pop()
+        if node.left is None:
+            results.append((node, node.value))
+        elif not expanded:
+            child_need = need or node.value == -1
+            stack.append((node, need, True))
+            stack.append((node.right, child_need, False))
+            stack.append((node.left, child_need, False))
+        else:
+            node.right, right_value = results.pop()
+            node.left, left_value = results.pop()
+            if node.value == -1:
+                value = left_value + right_value
+                results.append((NodeClass(value), value))
+            elif need:
+                results.append((node, _OPERATIONS[node.value](left_value, right_value)))
+            else:
+                results.append((node, None))
+    return results.pop()
+
+
+def remove_additions_fused(root):
+    """
+    Удаляет операции сложения из дерева за один проход
+    
+    В отличие от remove_additions не вызывает evaluate_tree для детей
+    каждого узла сложения: значения поддеревьев возвращаются вместе
+    с преобразованными узлами, поэтому каждый узел посещается один раз.
+    Результат совпадает с remove_additions. Функция не использует
+    рекурсию и подходит для деревьев любой глубины.
+    
+    Args:
+        root (NodeClass): Корень дерева (или поддерева)
+    
+    Returns:
+        NodeClass: Новый корень поддерева (без операций сложения)
+    """
+    if root is None:
+        return None
+    return _fold_additions(root, False)[0]
+
+
 def evaluate_tree(node):
     """
     Вычисляет значение выражения, представленного деревом
@@ -74,7 +174,7 @@ def evaluate_tree(node):
     Returns:
         int: Результат вычисления
     """
-    if node.value >= 0:
+    if node.left is None:
         return node.value
     
     left_value = evaluate_tree(node.left)
@@ -90,6 +190,36 @@ def evaluate_tree(node):
         return left_value // right_value
 
 
+def evaluate_tree_iterative(node):
+    """
+    Вычисляет значение выражения, представленного деревом, без рекурсии
+    
+    Обход выполняется явным стеком, поэтому глубина дерева ограничена
+    только памятью, а не sys.getrecursionlimit().
+    
+    Args:
+        node (NodeClass): Корень дерева (или поддерева)
+    
+    Returns:
+        int: Результат вычисления
+    """
+    values = []
+    # В стеке лежат узлы для обхода и коды операций, ожидающие операндов
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if type(current) is int:
+            right_value = values.pop()
+            values[-1] = _OPERATIONS[current](values[-1], right_value)
+        elif current.left is None:
+            values.append(current.value)
+        else:
+            stack.append(current.value)
+            stack.append(current.right)
+            stack.append(current.left)
+    return values.pop()
+
+
 def read_rpn_from_file(filename):
     """
     Читает выражение в обратной польской записи из файла
@@ -104,6 +234,85 @@ def read_rpn_from_file(filename):
         return f.readline().strip()
     
 
+# Коды операций по байтовому токену
+_BYTE_OPERATION_CODES = {symbol.encode(): code for symbol, code in _OPERATION_CODES.items()}
+
+# Пробельный символ - допустимая граница окна разбора
+_WHITESPACE = re.compile(rb'\s')
+
+
+def iter_rpn_tokens_mmap(filename, window_size=1 << 20):
+    """
+    Разбирает первую строку файла на токены прямо в отображенной памяти
+    
+    Файл отображается через mmap и разбирается окнами по window_size байт,
+    граница окна сдвигается до ближайшего пробела. Строка не читается
+    целиком и не декодируется в str: токены окна - короткоживущие срезы
+    байт, операция определяется поиском в словаре, число - через int().
+    Поддерживаются многозначные числа и числа со знаком ("-12", "+7").
+    
+    Args:
+        filename (str): Имя файла с выражением
+        window_size (int): Размер окна разбора в байтах
+    
+    Yields:
+        tuple: Пара (является ли токен операцией, код операции или число)
+    
+    Raises:
+        ValueError: Если в выражении встретился неизвестный токен
+    """
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = mm.find(b"\n")
+            if end == -1:
+                end = len(mm)
+            codes = _BYTE_OPERATION_CODES
+            position = 0
+            while position < end:
+                stop = min(position + window_size, end)
+                if stop < end:
+                    boundary = _WHITESPACE.search(mm, stop, end)
+                    stop = end if boundary is None else boundary.start()
+                for token in mm[position:stop].split():
+                    code = codes.get(token)
+                    if code is not None:
+                        yield True, code
+                        continue
+                    # Та же проверка, что в build_expression_tree: int() принял бы и "1_0"
+                    text = token.decode(errors='replace')
+                    if not _is_number(text):
+                        raise ValueError(f"Неизвестная операция: {text}")
+                    yield False, int(text)
+                position = stop
+
+
+def build_expression_tree_from_tokens(tokens):
+    """
+    Строит дерево выражения из готовых токенов
+    
+    Args:
+        tokens: Пары (является ли токен операцией, код операции или число),
+            например из iter_rpn_tokens_mmap
+    
+    Returns:
+        NodeClass: Указатель на корень построенного дерева
+    """
+    stack = []
+    for is_operation, value in tokens:
+        node = NodeClass(value)
+        if is_operation:
+            if len(stack) < 2:
+                raise ValueError("Некорректное выражение")
+            node.right = stack.pop()
+            node.left = stack.pop()
+        stack.append(node)
+    if len(stack) != 1:
+        raise ValueError("Некорректное выражение")
+    return stack.pop()
+
+
 def solve_problem(filename):
     """
     Основная функция решения задачи:
@@ -120,10 +329,383 @@ def solve_problem(filename):
     """
     rpn_expression = read_rpn_from_file(filename)
     root = build_expression_tree(rpn_expression)
-    new_root = remove_additions(root)
+    new_root = remove_additions_fused(root)
     return new_root
 
 
+def solve_problem_mmap(filename):
+    """
+    То же, что solve_problem, но выражение разбирается iter_rpn_tokens_mmap
+    
+    Args:
+        filename (str): Имя файла с выражением
+    
+    Returns:
+        NodeClass: Указатель на корень преобразованного дерева
+    """
+    root = build_expression_tree_from_tokens(iter_rpn_tokens_mmap(filename))
+    return remove_additions_fused(root)
+
+
+# Названия операций для подробного вывода дерева
+_OPERATION_NAMES = {-1: "сложение", -2: "вычитание", -3: "умножение", -4: "деление"}
+
+
+def _iter_rpn_chunks(root):
+    """Части записи дерева в RPN"""
+    first = True
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        if type(current) is str:
+            token = current
+        elif current.left is None:
+            token = str(current.value)
+        else:
+            stack.append(_OPERATION_SYMBOLS[current.value])
+            stack.append(current.right)
+            stack.append(current.left)
+            continue
+        if first:
+            first = False
+            yield token
+        else:
+            yield " " + token
+
+
+def _iter_infix_chunks(root):
+    """Части инфиксной записи дерева со скобками вокруг каждой операции"""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        if type(current) is str:
+            yield current
+        elif current.left is None:
+            yield str(current.value)
+        else:
+            stack.append(")")
+            stack.append(current.right)
+            stack.append(f" {_OPERATION_SYMBOLS[current.value]} ")
+            stack.append(current.left)
+            stack.append("(")
+
+
+def _iter_indented_chunks(root):
+    """Строки подробного вывода дерева с отступами, как в print_tree_detailed"""
+    # Элементы стека: (узел или None, уровень, префикс)
+    stack = [(root, 0, "Root: ")]
+    while stack:
+        node, level, prefix = stack.pop()
+        if node is None:
+            yield " " * (level * 4) + prefix + "None\n"
+            continue
+        if node.left is None and node.right is None:
+            yield " " * (level * 4) + prefix + str(node.value) + "\n"
+            continue
+        name = _OPERATION_NAMES.get(node.value, str(node.value))
+        yield " " * (level * 4) + prefix + f"{node.value} ({name})\n"
+        stack.append((node.right, level + 1, "R--- "))
+        stack.append((node.left, level + 1, "L--- "))
+
+
+# Генераторы частей вывода по названию формата
+_TREE_FORMATS = {
+    "rpn": _iter_rpn_chunks,
+    "infix": _iter_infix_chunks,
+    "indented": _iter_indented_chunks,
+}
+
+
+def iter_tree_chunks(root, fmt="indented"):
+    """
+    Выводит дерево по частям, обходя его без рекурсии
+    
+    Args:
+        root (NodeClass): Корень дерева
+        fmt (str): Формат: "indented" - дерево с отступами (как
+            print_tree_detailed), "infix" - инфиксная запись со скобками,
+            "rpn" - обратная польская запись
+    
+    Yields:
+        str: Очередная часть вывода
+    """
+    if fmt not in _TREE_FORMATS:
+        raise ValueError(f"Неизвестный формат вывода: {fmt}")
+    return _TREE_FORMATS[fmt](root)
+
+
+def write_tree(root, f, fmt="indented", buffer_size=1 << 16):
+    """
+    Записывает дерево в файл, собирая части вывода в буфер
+    
+    Части копятся в списке и записываются одним вызовом write, когда их
+    общий размер достигает buffer_size, поэтому память ограничена буфером
+    (и стеком обхода), а количество вызовов write - размером вывода.
+    
+    Args:
+        root (NodeClass): Корень дерева
+        f: Файл, открытый в текстовом режиме
+        fmt (str): Формат вывода (см. iter_tree_chunks)
+        buffer_size (int): Размер буфера в символах
+    """
+    parts = []
+    size = 0
+    for chunk in iter_tree_chunks(root, fmt):
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            f.write("".join(parts))
+            parts.clear()
+            size = 0
+    f.write("".join(parts))
+
+
+def write_tree_to_file(root, filename, fmt="indented"):
+    """
+    Записывает дерево в файл с заданным именем
+    
+    Args:
+        root (NodeClass): Корень дерева
+        filename (str): Имя файла для записи
+        fmt (str): Формат вывода (см. iter_tree_chunks)
+    """
+    with open(filename, 'w') as f:
+        write_tree(root, f, fmt)
+
+
+def tree_to_rpn(root):
+    """
+    Записывает дерево выражения в обратной польской записи
+    
+    Args:
+        root (NodeClass): Корень дерева
+    
+    Returns:
+        str: Выражение в RPN, токены разделены одним пробелом
+    """
+    return "".join(_iter_rpn_chunks(root))
+
+
+def iter_rpn_tokens(f, chunk_size=1 << 16):
+    """
+    Читает токены первой строки файла порциями, не загружая строку целиком
+    
+    Args:
+        f: Файл, открытый в текстовом режиме
+        chunk_size (int): Размер читаемой порции в символах
+    
+    Yields:
+        str: Очередной токен
+    """
+    tail = ""
+    while True:
+        chunk = f.read(chunk_size)
+        end = chunk.find("\n")
+        if end != -1:
+            chunk = chunk[:end]
+        tokens = (tail + chunk).split()
+        if chunk and not chunk[-1].isspace() and end == -1 and tokens:
+            # Последний токен может продолжаться в следующей порции
+            tail = tokens.pop()
+        else:
+            tail = ""
+        yield from tokens
+        if end != -1 or not chunk:
+            return
+
+
+def fold_additions_stream(tokens, out, buffer_size=1 << 16):
+    """
+    Потоково удаляет операции сложения: читает RPN токены и сразу пишет
+    преобразованное выражение в RPN, не строя дерево
+    
+    На стеке хранятся только живые операнды: для каждого - смещение его
+    записи в выходном файле и значение. Записи операндов на стеке идут
+    в файле подряд, поэтому при сложении двух верхних операндов их текст
+    обрезается и заменяется вычисленным значением. Память пропорциональна
+    глубине стека (плюс буфер записи), а не размеру выражения.
+    
+    Результат побайтно совпадает с tree_to_rpn(remove_additions(root)).
+    Деление на ноль вне сложений, как и в remove_additions, ошибкой не
+    считается: значение такого операнда остается неопределенным (None).
+    
+    Args:
+        tokens: Итерируемый источник токенов (строк)
+        out: Выходной файл в двоичном режиме с поддержкой seek/truncate
+        buffer_size (int): Размер буфера записи в байтах
+    
+    Returns:
+        int: Значение выражения или None, если оно неопределено
+    """
+    base = out.tell()
+    # Буфер хранит хвост вывода, начинающийся со смещения flushed
+    buffer = bytearray()
+    flushed = base
+    # Элементы стека - (смещение начала записи операнда, значение)
+    stack = []
+    for token in tokens:
+        start = flushed + len(buffer)
+        if _is_number(token):
+            value = int(token)
+            # Как в tree_to_rpn: "007" и "+7" записываются как "7"
+            text = str(value)
+        else:
+            code = _OPERATION_CODES.get(token)
+            if code is None:
+                raise ValueError(f"Неизвестная операция: {token}")
+            if len(stack) < 2:
+                raise ValueError("Некорректное выражение")
+            _, right_value = stack.pop()
+            start, left_value = stack.pop()
+            if code == -1:
+                if left_value is None or right_value is None:
+                    raise ZeroDivisionError("integer division or modulo by zero")
+                value = left_value + right_value
+                text = str(value)
+                # Обрезаем записи обоих операндов
+                if start >= flushed:
+                    del buffer[start - flushed:]
+                else:
+                    out.seek(start)
+                    out.truncate()
+                    buffer.clear()
+                    flushed = start
+            else:
+                if left_value is None or right_value is None:
+                    value = None
+                else:
+                    try:
+                        value = _OPERATIONS[code](left_value, right_value)
+                    except ZeroDivisionError:
+                        value = None
+                text = token
+        if flushed + len(buffer) > base:
+            buffer += b" "
+        buffer += text.encode("ascii")
+        stack.append((start, value))
+        if len(buffer) >= buffer_size:
+            out.write(buffer)
+            flushed += len(buffer)
+            buffer.clear()
+    if len(stack) != 1:
+        raise ValueError("Некорректное выражение")
+    out.write(buffer)
+    return stack[0][1]
+
+
+def fold_additions_file(input_filename, output_filename):
+    """
+    Потоково удаляет операции сложения из выражения в файле
+    
+    Выходной файл совпадает с tree_to_rpn(solve_problem(input_filename))
+    с завершающим переводом строки.
+    
+    Args:
+        input_filename (str): Имя файла с выражением в RPN
+        output_filename (str): Имя файла для преобразованного выражения
+    
+    Returns:
+        int: Значение выражения или None, если оно неопределено
+    """
+    with open(input_filename, 'r') as f, open(output_filename, 'w+b') as out:
+        value = fold_additions_stream(iter_rpn_tokens(f), out)
+        out.write(b"\n")
+    return value
+
+
+def _solve_expression(rpn_expression):
+    """
+    Решает задачу для одного выражения пакета
+    
+    Args:
+        rpn_expression (str): Выражение в RPN
+    
+    Returns:
+        str: Строка результата: преобразованное выражение и его значение
+            через табуляцию, либо сообщение об ошибке
+    """
+    if not rpn_expression.strip():
+        return "\n"
+    try:
+        root = remove_additions_fused(build_expression_tree(rpn_expression))
+        return f"{tree_to_rpn(root)}\t{evaluate_tree_iterative(root)}\n"
+    except Exception as e:
+        return f"Ошибка: {e}\n"
+
+
+def _solve_chunk(lines):
+    """
+    Решает задачу для порции выражений (выполняется в процессе пула)
+    
+    Args:
+        lines (list): Выражения порции
+    
+    Returns:
+        list: Строки результатов в том же порядке
+    """
+    return [_solve_expression(line) for line in lines]
+
+
+def _iter_chunks(f, chunk_size):
+    """
+    Читает файл порциями по chunk_size строк
+    
+    Yields:
+        list: Очередная порция строк
+    """
+    chunk = []
+    for line in f:
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_batch(input_filename, output_filename, workers=None, chunk_size=1000):
+    """
+    Пакетный режим: решает задачу для каждого выражения файла (по одному
+    на строке) в пуле процессов
+    
+    Строки читаются потоково и отправляются в пул порциями. В работе
+    одновременно не больше 2 * workers порций, поэтому память не зависит
+    от размера файла. Результаты записываются в порядке входных строк:
+    преобразованное выражение в RPN и его значение через табуляцию,
+    для ошибочных выражений - сообщение "Ошибка: ...", для пустых строк -
+    пустая строка.
+    
+    Args:
+        input_filename (str): Имя файла с выражениями
+        output_filename (str): Имя файла для результатов
+        workers (int): Количество процессов (по умолчанию - число ядер)
+        chunk_size (int): Количество выражений в порции
+    
+    Returns:
+        dict: Статистика: количество выражений, время в секундах
+            и пропускная способность (выражений в секунду)
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    expressions = 0
+    with open(input_filename, 'r') as f, open(output_filename, 'w') as out, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for chunk in _iter_chunks(f, chunk_size):
+            expressions += len(chunk)
+            pending.append(executor.submit(_solve_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                out.writelines(pending.popleft().result())
+        while pending:
+            out.writelines(pending.popleft().result())
+    seconds = time.perf_counter() - start
+    return {
+        "expressions": expressions,
+        "seconds": seconds,
+        "expressions_per_second": expressions / seconds if seconds else 0.0,
+    }
+
+
 def main():
     """
     Точка входа в программу
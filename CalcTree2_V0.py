@@ -129,22 +129,15 @@ def print_tree(node, level=0, prefix="Root: "):
     """
     Выводит дерево в удобном для чтения формате.
     
+    Обход выполняется явным стеком, поэтому глубина дерева
+    не ограничена лимитом рекурсии.
+    
     Args:
         node (TreeNode): Узел дерева
         level (int): Уровень вложенности
         prefix (str): Префикс для вывода
     """
-    if node is not None:
-        print(" " * (level * 4) + prefix + str(node.value))
-        if node.left is not None or node.right is not None:
-            if node.left:
-                print_tree(node.left, level + 1, "L--- ")
-            else:
-                print(" " * ((level + 1) * 4) + "L--- None")
-            if node.right:
-                print_tree(node.right, level + 1, "R--- ")
-            else:
-                print(" " * ((level + 1) * 4) + "R--- None")
+    _print_tree_iterative(node, level, prefix, lambda current: str(current.value))
 
 def get_operation_name(code):
     """
@@ -159,31 +152,57 @@ def get_operation_name(code):
     operations = {-1: "сложение", -2: "вычитание", -3: "умножение", -4: "деление"}
     return operations.get(code, str(code))
 
+def _format_detailed(node):
+    """
+    Возвращает значение узла с названием операции.
+    
+    Args:
+        node (TreeNode): Узел дерева
+        
+    Returns:
+        str: Текст для вывода
+    """
+    if node.is_operation():
+        return f"{node.value} ({get_operation_name(node.value)})"
+    return str(node.value)
+
+def _print_tree_iterative(node, level, prefix, format_value):
+    """
+    Выводит дерево без рекурсии.
+    
+    Args:
+        node (TreeNode): Корень выводимого дерева
+        level (int): Уровень вложенности корня
+        prefix (str): Префикс для корня
+        format_value (callable): Функция, возвращающая текст узла
+    """
+    if node is None:
+        return
+    # Элементы стека: (узел или None, уровень, префикс)
+    stack = [(node, level, prefix)]
+    while stack:
+        current, level, prefix = stack.pop()
+        if current is None:
+            print(" " * (level * 4) + prefix + "None")
+            continue
+        print(" " * (level * 4) + prefix + format_value(current))
+        if current.left is not None or current.right is not None:
+            stack.append((current.right, level + 1, "R--- "))
+            stack.append((current.left, level + 1, "L--- "))
+
 def print_tree_detailed(node, level=0, prefix="Root: "):
     """
     Выводит дерево с подробным описанием операций.
     
+    Обход выполняется явным стеком, поэтому глубина дерева
+    не ограничена лимитом рекурсии.
+    
     Args:
         node (TreeNode): Узел дерева
         level (int): Уровень вложенности
         prefix (str): Префикс для вывода
     """
-    if node is not None:
-        if node.is_operation():
-            display_value = f"{node.value} ({get_operation_name(node.value)})"
-        else:
-            display_value = str(node.value)
-        
-        print(" " * (level * 4) + prefix + display_value)
-        if node.left is not None or node.right is not None:
-            if node.left:
-                print_tree_detailed(node.left, level + 1, "L--- ")
-            else:
-                print(" " * ((level + 1) * 4) + "L--- None")
-            if node.right:
-                print_tree_detailed(node.right, level + 1, "R--- ")
-            else:
-                print(" " * ((level + 1) * 4) + "R--- None")
+    _print_tree_iterative(node, level, prefix, _format_detailed)
 
 def main():
     """
@@ -0,0 +1,349 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from CalcTree2 import _OPERATION_CODES, _OPERATIONS, _is_number, read_rpn_from_file
+
+# Индекс отсутствующего ребенка
+NO_CHILD = -1
+
+# Заголовок двоичного файла: сигнатура, версия, количество узлов
+_BINARY_MAGIC = b"CT2B"
+_BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct("<4sIQ")
+# Запись узла: значение/код операции, левый и правый ребенок
+_BINARY_RECORD = struct.Struct("<qqq")
+
+
+class ArrayTree:
+    """
+    Дерево выражения в виде параллельных массивов (struct-of-arrays)
+
+    Узел адресуется целым индексом. values[i] - число в листе или код
+    операции (-1..-4) во внутреннем узле, lefts[i] и rights[i] - индексы
+    детей (NO_CHILD у листа). Лист определяется по lefts[i] == NO_CHILD,
+    поэтому отрицательные числа в листьях допустимы.
+
+    Узлы хранятся в порядке обратного обхода, как в RPN: дети всегда
+    имеют меньшие индексы, чем родитель, поддерево занимает непрерывный
+    отрезок индексов, а корень - последний узел.
+
+    Память: три массива array('q') по 8 байт, то есть 24 байта на узел
+    (плюс запас, который array резервирует при росте). NodeClass занимает
+    около 96 байт на узел. Значения должны помещаться в 64-битное целое,
+    иначе при записи возникает OverflowError.
+    """
+    def __init__(self, values=None, lefts=None, rights=None):
+        self.values = array('q') if values is None else values
+        self.lefts = array('q') if lefts is None else lefts
+        self.rights = array('q') if rights is None else rights
+        # Отображенный файл, если дерево загружено load_array_tree
+        self._mmap = None
+
+    def close(self):
+        """
+        Освобождает отображенный файл дерева, загруженного load_array_tree
+        """
+        if self._mmap is not None:
+            for buffer in (self.values, self.lefts, self.rights):
+                buffer.release()
+            self.values, self.lefts, self.rights = array('q'), array('q'), array('q')
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def root(self):
+        """Индекс корня дерева"""
+        return len(self.values) - 1
+
+    def root_node(self):
+        """
+        Возвращает корень в виде узла, совместимого с NodeClass
+
+        Returns:
+            ArrayNode: Представление корня (None для пустого дерева)
+        """
+        if not self.values:
+            return None
+        return ArrayNode(self, self.root)
+
+    def nbytes(self):
+        """
+        Возвращает объем памяти, занятый данными узлов
+
+        Returns:
+            int: Количество байт в трех массивах
+        """
+        return sum(len(buffer) * buffer.itemsize
+                   for buffer in (self.values, self.lefts, self.rights))
+
+
+class ArrayNode:
+    """
+    Представление узла ArrayTree с интерфейсом NodeClass
+
+    Атрибуты value, left и right вычисляются из массивов дерева, поэтому
+    evaluate_tree, evaluate_tree_iterative и другой код, читающий узлы,
+    работает с ArrayTree без преобразования. Представление только для чтения.
+    """
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def value(self):
+        return self.tree.values[self.index]
+
+    @property
+    def left(self):
+        child = self.tree.lefts[self.index]
+        return None if child == NO_CHILD else ArrayNode(self.tree, child)
+
+    @property
+    def right(self):
+        child = self.tree.rights[self.index]
+        return None if child == NO_CHILD else ArrayNode(self.tree, child)
+
+
+def build_array_tree(rpn_expression):
+    """
+    Строит ArrayTree из обратной польской записи
+
+    Args:
+        rpn_expression (str): Строка с выражением в RPN (например "3 4 + 2 *")
+
+    Returns:
+        ArrayTree: Построенное дерево
+    """
+    tree = ArrayTree()
+    values, lefts, rights = tree.values, tree.lefts, tree.rights
+    stack = []
+    for token in rpn_expression.split():
+        if _is_number(token):
+            values.append(int(token))
+            lefts.append(NO_CHILD)
+            rights.append(NO_CHILD)
+        else:
+            code = _OPERATION_CODES.get(token)
+            if code is None:
+                raise ValueError(f"Неизвестная операция: {token}")
+            right = stack.pop()
+            values.append(code)
+            lefts.append(stack.pop())
+            rights.append(right)
+        stack.append(len(values) - 1)
+    if len(stack) != 1:
+        raise ValueError("Некорректное выражение")
+    return tree
+
+
+def _subtree_start(lefts, index):
+    """
+    Возвращает первый индекс отрезка, занятого поддеревом
+
+    В порядке обратного обхода поддерево начинается с самого левого листа.
+    """
+    while lefts[index] != NO_CHILD:
+        index = lefts[index]
+    return index
+
+
+def _evaluate_range(values, lefts, start, stop):
+    """
+    Вычисляет поддерево, занимающее отрезок [start, stop) массивов
+
+    Отрезок - это запись поддерева в RPN, поэтому достаточно одного
+    прохода со стеком операндов.
+    """
+    stack = []
+    for i in range(start, stop):
+        if lefts[i] == NO_CHILD:
+            stack.append(values[i])
+        else:
+            right_value = stack.pop()
+            stack[-1] = _OPERATIONS[values[i]](stack[-1], right_value)
+    return stack.pop()
+
+
+def evaluate_array_tree(tree, index=None):
+    """
+    Вычисляет значение выражения, представленного ArrayTree
+
+    Args:
+        tree (ArrayTree): Дерево выражения
+        index (int): Корень вычисляемого поддерева (по умолчанию корень дерева)
+
+    Returns:
+        int: Результат вычисления
+    """
+    if index is None:
+        index = tree.root
+    start = _subtree_start(tree.lefts, index)
+    return _evaluate_range(tree.values, tree.lefts, start, index + 1)
+
+
+def remove_additions_array(tree):
+    """
+    Удаляет операции сложения из ArrayTree, заменяя их вычисленным значением
+
+    Узлы переносятся в новое дерево одним проходом в порядке RPN. Когда
+    встречается сложение, поддеревья его детей уже лежат в конце новых
+    массивов: они вычисляются, отрезок обрезается и заменяется листом.
+    Каждый узел вычисляется не более одного раза, а поддеревья вне
+    сложений не вычисляются вовсе, как и в remove_additions.
+
+    Args:
+        tree (ArrayTree): Исходное дерево (не изменяется)
+
+    Returns:
+        ArrayTree: Новое дерево без операций сложения
+    """
+    result = ArrayTree()
+    values, lefts, rights = result.values, result.lefts, result.rights
+    # Для каждого поддерева на стеке - индекс его начала в новых массивах
+    starts = []
+    old_values, old_lefts = tree.values, tree.lefts
+    for i in range(len(old_values)):
+        value = old_values[i]
+        if old_lefts[i] == NO_CHILD:
+            starts.append(len(values))
+            values.append(value)
+            lefts.append(NO_CHILD)
+            rights.append(NO_CHILD)
+            continue
+        right_start = starts.pop()
+        left_start = starts[-1]
+        if value == -1:
+            left_value = _evaluate_range(values, lefts, left_start, right_start)
+            right_value = _evaluate_range(values, lefts, right_start, len(values))
+            del values[left_start:], lefts[left_start:], rights[left_start:]
+            values.append(left_value + right_value)
+            lefts.append(NO_CHILD)
+            rights.append(NO_CHILD)
+        else:
+            values.append(value)
+            lefts.append(right_start - 1)
+            rights.append(len(values) - 2)
+    return result
+
+
+def solve_problem_array(filename):
+    """
+    Решает задачу на компактном представлении дерева:
+    читает RPN выражение, строит ArrayTree и удаляет операции сложения
+
+    Args:
+        filename (str): Имя файла с выражением
+
+    Returns:
+        ArrayTree: Преобразованное дерево (корень - ArrayTree.root)
+    """
+    return remove_additions_array(build_array_tree(read_rpn_from_file(filename)))
+
+
+def array_tree_from_nodes(root):
+    """
+    Преобразует дерево из NodeClass (например, результат solve_problem) в ArrayTree
+
+    Args:
+        root (NodeClass): Корень дерева
+
+    Returns:
+        ArrayTree: То же дерево в компактном представлении
+    """
+    tree = ArrayTree()
+    values, lefts, rights = tree.values, tree.lefts, tree.rights
+    indices = []
+    # В стеке лежат узлы для обхода и узлы, ожидающие индексов детей
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node.left is None:
+            values.append(node.value)
+            lefts.append(NO_CHILD)
+            rights.append(NO_CHILD)
+        elif not expanded:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+            continue
+        else:
+            right = indices.pop()
+            values.append(node.value)
+            lefts.append(indices.pop())
+            rights.append(right)
+        indices.append(len(values) - 1)
+    return tree
+
+
+def write_array_tree(tree, filename, chunk_nodes=1 << 16):
+    """
+    Записывает ArrayTree в компактный двоичный файл
+
+    Формат: заголовок (сигнатура "CT2B", версия, количество узлов),
+    затем по одной записи на узел в порядке обратного обхода - три
+    64-битных целых little-endian: значение или код операции, индекс
+    левого и индекс правого ребенка (-1 у листа). Корень - последняя запись.
+
+    Args:
+        tree (ArrayTree): Дерево
+        filename (str): Имя файла для записи
+        chunk_nodes (int): Количество узлов, записываемых за раз
+    """
+    with open(filename, "wb") as f:
+        f.write(_BINARY_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION, len(tree)))
+        for start in range(0, len(tree), chunk_nodes):
+            stop = min(start + chunk_nodes, len(tree))
+            records = array('q', bytes(_BINARY_RECORD.size * (stop - start)))
+            records[0::3] = array('q', tree.values[start:stop])
+            records[1::3] = array('q', tree.lefts[start:stop])
+            records[2::3] = array('q', tree.rights[start:stop])
+            if sys.byteorder != "little":
+                records.byteswap()
+            f.write(records)
+
+
+def load_array_tree(filename):
+    """
+    Загружает ArrayTree из двоичного файла без разбора в объекты Python
+
+    Файл отображается в память через mmap, а массивы дерева становятся
+    срезами memoryview с шагом 3 поверх записей, поэтому загрузка не
+    зависит от размера дерева. evaluate_array_tree, remove_additions_array
+    и ArrayNode работают с загруженным деревом напрямую. После работы
+    дерево нужно закрыть методом close().
+
+    Args:
+        filename (str): Имя файла, записанного write_array_tree
+
+    Returns:
+        ArrayTree: Дерево поверх отображенного файла
+
+    Raises:
+        ValueError: Если файл имеет неверный формат
+    """
+    with open(filename, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if len(mm) < _BINARY_HEADER.size:
+            raise ValueError("Файл слишком короткий для дерева выражения")
+        magic, version, count = _BINARY_HEADER.unpack_from(mm)
+        if magic != _BINARY_MAGIC or version != _BINARY_VERSION:
+            raise ValueError("Неизвестный формат файла дерева выражения")
+        if len(mm) != _BINARY_HEADER.size + count * _BINARY_RECORD.size:
+            raise ValueError("Размер файла не совпадает с количеством узлов")
+        if sys.byteorder != "little":
+            raise ValueError("Отображение файла поддерживается только на little-endian платформах")
+    except ValueError:
+        mm.close()
+        raise
+    records = memoryview(mm)[_BINARY_HEADER.size:].cast('q')
+    tree = ArrayTree(records[0::3], records[1::3], records[2::3])
+    tree._mmap = mm
+    return tree
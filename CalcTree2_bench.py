@@ -0,0 +1,476 @@
+import argparse
+import collections
+import json
+import operator
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import CalcTree2_chatGPT
+import CalcTree2_deepseek
+import CalcTree2_V0
+from CalcTree2 import (_OPERATION_CODES, _is_number, build_expression_tree, evaluate_tree,
+                       evaluate_tree_iterative, iter_rpn_tokens_mmap, read_rpn_from_file,
+                       remove_additions, remove_additions_fused)
+from CalcTree2_array import (NO_CHILD, ArrayTree, build_array_tree, evaluate_array_tree,
+                             remove_additions_array)
+from CalcTree2_compile import compile_tree, leaf_values
+from CalcTree2_dag import compare_dag_evaluation
+from CalcTree2_parallel import evaluate_array_tree_parallel
+
+# Наибольшее значение подвыражения в сгенерированных выражениях: все
+# промежуточные значения помещаются в int64 (см. CalcTree2_array)
+VALUE_LIMIT = 10 ** 9
+
+# Функции операций по символу
+_OPERATIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.floordiv,
+}
+
+
+def generate_rpn(n_leaves, seed=0, addition_share=0.5):
+    """
+    Генерирует случайное выражение в обратной польской записи
+
+    Дерево строится сбалансированным: каждая операция объединяет
+    два соседних поддерева. Деление используется только с правым
+    операндом-листом (цифра 1..9), а вычитание - только если результат
+    неотрицателен: отрицательные значения совпадают с кодами операций.
+    Сложение и умножение выбираются, только если значение не превышает
+    VALUE_LIMIT, иначе операнды вычитаются (больший слева) или делятся.
+
+    Args:
+        n_leaves (int): Количество чисел в выражении
+        seed (int): Зерно генератора случайных чисел
+        addition_share (float): Доля операций сложения
+
+    Returns:
+        str: Выражение в RPN
+    """
+    rng = random.Random(seed)
+    # Каждый элемент - (список токенов, значение поддерева, является ли листом)
+    level = []
+    for _ in range(n_leaves):
+        digit = rng.randint(1, 9)
+        level.append(([str(digit)], digit, True))
+    while len(level) > 1:
+        next_level = []
+        for k in range(0, len(level) - 1, 2):
+            (left, left_value, _), (right, right_value, right_is_leaf) = level[k], level[k + 1]
+            if rng.random() < addition_share and left_value + right_value <= VALUE_LIMIT:
+                op = '+'
+            else:
+                # Деление - только на лист; вычитание всегда возможно
+                # (операнды меняются местами, чтобы результат был неотрицателен)
+                ops = '-'
+                if left_value * right_value <= VALUE_LIMIT:
+                    ops += '*'
+                if right_is_leaf:
+                    ops += '/'
+                op = rng.choice(ops)
+                if op == '-' and left_value < right_value:
+                    left, left_value, right, right_value = right, right_value, left, left_value
+            value = _OPERATIONS[op](left_value, right_value)
+            next_level.append((left + right + [op], value, False))
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return " ".join(level[0][0])
+
+
+def generate_left_deep_rpn(n_leaves, seed=0):
+    """
+    Генерирует выражение в виде левостороннего дерева: "a b op c op d op ..."
+
+    Правый операнд каждой операции - цифра 1..9. Как и в generate_rpn,
+    вычитание используется только без отрицательного результата,
+    а значения не превышают VALUE_LIMIT.
+
+    Args:
+        n_leaves (int): Количество чисел в выражении
+        seed (int): Зерно генератора случайных чисел
+
+    Returns:
+        str: Выражение в RPN
+    """
+    rng = random.Random(seed)
+    value = rng.randint(1, 9)
+    tokens = [str(value)]
+    for _ in range(n_leaves - 1):
+        digit = rng.randint(1, 9)
+        ops = '/'
+        if value + digit <= VALUE_LIMIT:
+            ops += '+'
+        if value * digit <= VALUE_LIMIT:
+            ops += '*'
+        if value >= digit:
+            ops += '-'
+        op = rng.choice(ops)
+        value = _OPERATIONS[op](value, digit)
+        tokens.append(str(digit))
+        tokens.append(op)
+    return " ".join(tokens)
+
+
+# Формы генерируемых выражений
+SHAPES = {
+    "balanced": lambda n_leaves, seed: generate_rpn(n_leaves, seed, addition_share=0.3),
+    "left-deep": generate_left_deep_rpn,
+    "addition-heavy": lambda n_leaves, seed: generate_rpn(n_leaves, seed, addition_share=0.9),
+}
+
+
+def generate_repetitive_rpn(n_leaves, n_patterns=16, pattern_leaves=8, seed=0):
+    """
+    Генерирует выражение с многократно повторяющимися подвыражениями
+
+    Сбалансированное дерево над n_leaves "листьями", каждый из которых -
+    одно из n_patterns случайных подвыражений по pattern_leaves чисел.
+
+    Args:
+        n_leaves (int): Количество подвыражений в выражении
+        n_patterns (int): Количество различных подвыражений
+        pattern_leaves (int): Количество чисел в одном подвыражении
+        seed (int): Зерно генератора случайных чисел
+
+    Returns:
+        str: Выражение в RPN
+    """
+    rng = random.Random(seed)
+    patterns = [generate_rpn(pattern_leaves, seed * n_patterns + k) for k in range(n_patterns)]
+    level = [[rng.choice(patterns)] for _ in range(n_leaves)]
+    while len(level) > 1:
+        next_level = [level[k] + level[k + 1] + [rng.choice('+-*')]
+                      for k in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return " ".join(level[0])
+
+
+def generate_balanced_array_tree(n_leaves, seed=0):
+    """
+    Генерирует сбалансированное ArrayTree без промежуточной записи в RPN
+
+    Используются только сложение и вычитание, чтобы значения оставались
+    небольшими и время вычисления зависело от числа узлов, а не от
+    длины чисел.
+
+    Args:
+        n_leaves (int): Количество листьев
+        seed (int): Зерно генератора случайных чисел
+
+    Returns:
+        ArrayTree: Дерево из 2 * n_leaves - 1 узлов
+    """
+    rng = random.Random(seed)
+    tree = ArrayTree()
+    values, lefts, rights = tree.values, tree.lefts, tree.rights
+    indices = []
+    # Элементы стека - (начало, конец отрезка листьев, дети уже построены)
+    stack = [(0, n_leaves, False)]
+    while stack:
+        low, high, expanded = stack.pop()
+        if high - low == 1:
+            values.append(rng.randint(1, 9))
+            lefts.append(NO_CHILD)
+            rights.append(NO_CHILD)
+        elif not expanded:
+            middle = (low + high) // 2
+            stack.append((low, high, True))
+            stack.append((middle, high, False))
+            stack.append((low, middle, False))
+            continue
+        else:
+            right = indices.pop()
+            values.append(rng.choice((-1, -2)))
+            lefts.append(indices.pop())
+            rights.append(right)
+        indices.append(len(values) - 1)
+    return tree
+
+
+def time_call(func, *args):
+    """
+    Измеряет время выполнения функции
+
+    Returns:
+        tuple: Пара (результат, время в секундах)
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+# Реализации задачи: построение дерева из RPN, remove_additions, вычисление
+IMPLEMENTATIONS = {
+    "CalcTree2": (build_expression_tree, remove_additions, evaluate_tree),
+    "CalcTree2_iterative": (build_expression_tree, remove_additions_fused, evaluate_tree_iterative),
+    "CalcTree2_array": (build_array_tree, remove_additions_array, evaluate_array_tree),
+    "CalcTree2_V0": (lambda rpn: CalcTree2_V0.build_tree_from_rpn(rpn.split()),
+                     CalcTree2_V0.remove_additions, CalcTree2_V0.evaluate_tree),
+    "CalcTree2_chatGPT": (lambda rpn: CalcTree2_chatGPT.build_tree_from_rpn(rpn.split()),
+                          CalcTree2_chatGPT.remove_additions, CalcTree2_chatGPT.evaluate),
+    "CalcTree2_deepseek": (CalcTree2_deepseek.build_expression_tree,
+                           CalcTree2_deepseek.remove_additions, CalcTree2_deepseek.evaluate_tree),
+}
+
+
+def measure_implementation(name, rpn_expression, measure_memory=True):
+    """
+    Измеряет одну реализацию на одном выражении
+
+    Построение, вычисление и remove_additions замеряются отдельно, каждый
+    раз на свежем дереве (remove_additions изменяет дерево). Пиковая память
+    построения и remove_additions измеряется tracemalloc в отдельном
+    прогоне, чтобы трассировка не искажала время.
+
+    Args:
+        name (str): Имя реализации из IMPLEMENTATIONS
+        rpn_expression (str): Выражение в RPN
+        measure_memory (bool): Измерять ли пиковую память
+
+    Returns:
+        dict: Время build, evaluate, remove_additions в секундах, пиковая
+            память в байтах и ошибка (например, RecursionError), если была
+    """
+    build, remove, evaluate = IMPLEMENTATIONS[name]
+    result = {"build": None, "evaluate": None, "remove_additions": None,
+              "peak_memory": None, "error": None}
+    try:
+        tree, result["build"] = time_call(build, rpn_expression)
+        _, result["evaluate"] = time_call(evaluate, tree)
+        del tree
+        _, result["remove_additions"] = time_call(remove, build(rpn_expression))
+        if measure_memory:
+            tracemalloc.start()
+            try:
+                remove(build(rpn_expression))
+                result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    except (RecursionError, ArithmeticError, MemoryError) as e:
+        result["error"] = type(e).__name__
+    return result
+
+
+def run_suite(sizes=(10, 100, 1000, 10000, 100000, 1000000), shapes=tuple(SHAPES),
+              implementations=tuple(IMPLEMENTATIONS), seed=0, measure_memory=True):
+    """
+    Запускает бенчмарк всех реализаций на сгенерированных выражениях
+
+    Args:
+        sizes (tuple): Количества узлов в деревьях
+        shapes (tuple): Формы выражений из SHAPES
+        implementations (tuple): Имена реализаций из IMPLEMENTATIONS
+        seed (int): Зерно генератора
+        measure_memory (bool): Измерять ли пиковую память
+
+    Returns:
+        dict: Описание окружения и список результатов, пригодные для JSON
+    """
+    results = []
+    for shape in shapes:
+        for size in sizes:
+            rpn_expression = SHAPES[shape]((size + 1) // 2, seed)
+            for name in implementations:
+                row = {"implementation": name, "shape": shape, "nodes": size}
+                row.update(measure_implementation(name, rpn_expression, measure_memory))
+                results.append(row)
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def bench_remove_additions(sizes=(1000, 10000, 100000), seed=0):
+    """
+    Сравнивает remove_additions и remove_additions_fused на одинаковых деревьях
+
+    Args:
+        sizes (tuple): Количества чисел в выражениях
+        seed (int): Зерно генератора
+
+    Returns:
+        list: Список словарей с результатами замеров
+    """
+    results = []
+    for size in sizes:
+        rpn = generate_rpn(size, seed)
+        _, original = time_call(remove_additions, build_expression_tree(rpn))
+        _, fused = time_call(remove_additions_fused, build_expression_tree(rpn))
+        results.append({"leaves": size, "remove_additions": original,
+                        "remove_additions_fused": fused})
+    return results
+
+
+def bench_compiled(sizes=(1000, 10000, 100000), repeats=20, seed=0):
+    """
+    Сравнивает вычисление дерева обходом и скомпилированной функцией
+
+    Args:
+        sizes (tuple): Количества узлов в деревьях
+        repeats (int): Количество повторных вычислений
+        seed (int): Зерно генератора
+
+    Returns:
+        list: Словари со временем компиляции и временем одного вычисления
+    """
+    results = []
+    for size in sizes:
+        root = build_expression_tree(generate_rpn((size + 1) // 2, seed))
+        bindings = leaf_values(root)
+        function, compile_seconds = time_call(compile_tree, root)
+        row = {"nodes": size, "compile": compile_seconds}
+        for name, func, args in (("evaluate_tree", evaluate_tree, root),
+                                 ("evaluate_tree_iterative", evaluate_tree_iterative, root),
+                                 ("compiled", function, bindings)):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                func(args)
+            row[name] = (time.perf_counter() - start) / repeats
+        results.append(row)
+    return results
+
+
+def bench_parallel(sizes=(10 ** 6,), worker_counts=None, seed=0):
+    """
+    Измеряет ускорение evaluate_array_tree_parallel в зависимости от числа процессов
+
+    Args:
+        sizes (tuple): Количества узлов (для 10**8 нужно около 3 ГБ памяти)
+        worker_counts (tuple): Количества процессов (по умолчанию 1, 2, 4, ... ядер)
+        seed (int): Зерно генератора
+
+    Returns:
+        list: Словари с размером дерева, числом процессов, временем и ускорением
+    """
+    if worker_counts is None:
+        cores = os.cpu_count() or 1
+        worker_counts = sorted({1, cores} | {2 ** k for k in range(cores.bit_length()) if 2 ** k <= cores})
+    results = []
+    for size in sizes:
+        tree = generate_balanced_array_tree((size + 1) // 2, seed)
+        serial = None
+        for workers in worker_counts:
+            _, seconds = time_call(evaluate_array_tree_parallel, tree, workers, 0)
+            serial = serial or seconds
+            results.append({"nodes": len(tree), "workers": workers,
+                            "seconds": seconds, "speedup": serial / seconds})
+    return results
+
+
+def _split_tokens(filename):
+    """
+    Текущий путь разбора: чтение строки и split() с преобразованием токенов
+
+    Yields:
+        tuple: Пара (является ли токен операцией, код операции или число)
+    """
+    for token in read_rpn_from_file(filename).split():
+        if _is_number(token):
+            yield False, int(token)
+        else:
+            yield True, _OPERATION_CODES[token]
+
+
+def bench_tokenizer(n_leaves=1000000, seed=0):
+    """
+    Сравнивает скорость разбора iter_rpn_tokens_mmap и пути через split()
+
+    Args:
+        n_leaves (int): Количество чисел в сгенерированном выражении
+        seed (int): Зерно генератора
+
+    Returns:
+        dict: Размер файла в МБ и скорость каждого способа в МБ/с
+    """
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write(generate_rpn(n_leaves, seed))
+        filename = f.name
+    try:
+        megabytes = os.path.getsize(filename) / 2 ** 20
+        result = {"megabytes": megabytes}
+        for name, tokenizer in (("split", _split_tokens), ("mmap", iter_rpn_tokens_mmap)):
+            _, seconds = time_call(collections.deque, tokenizer(filename), 0)
+            result[name] = megabytes / seconds
+    finally:
+        os.remove(filename)
+    return result
+
+
+def print_micro_benchmarks():
+    """
+    Печатает таблицы отдельных замеров: fused-свертка, граф с общими
+    подвыражениями, компиляция, параллельное вычисление и разбор файла
+    """
+    print(f"{'чисел':>10} {'remove_additions':>18} {'fused':>10} {'ускорение':>10}")
+    for row in bench_remove_additions():
+        speedup = row["remove_additions"] / row["remove_additions_fused"]
+        print(f"{row['leaves']:>10} {row['remove_additions']:>18.4f} "
+              f"{row['remove_additions_fused']:>10.4f} {speedup:>10.2f}")
+
+    print(f"\n{'узлов дерева':>14} {'узлов графа':>12} {'сокращение':>11} {'ускорение':>10}")
+    for n_leaves in (1000, 10000, 100000):
+        dag = compare_dag_evaluation(generate_repetitive_rpn(n_leaves))
+        print(f"{dag['tree_nodes']:>14} {dag['dag_nodes']:>12} "
+              f"{dag['node_reduction']:>11.1f} {dag['speedup']:>10.1f}")
+
+    print(f"\n{'узлов':>8} {'компиляция':>11} {'evaluate_tree':>14} "
+          f"{'iterative':>10} {'compiled':>10}")
+    for row in bench_compiled():
+        print(f"{row['nodes']:>8} {row['compile']:>11.4f} {row['evaluate_tree']:>14.5f} "
+              f"{row['evaluate_tree_iterative']:>10.5f} {row['compiled']:>10.5f}")
+
+    print(f"\n{'узлов':>10} {'процессов':>10} {'время':>8} {'ускорение':>10}")
+    for row in bench_parallel():
+        print(f"{row['nodes']:>10} {row['workers']:>10} {row['seconds']:>8.3f} {row['speedup']:>10.2f}")
+
+    tokenizer = bench_tokenizer()
+    print(f"\nРазбор {tokenizer['megabytes']:.1f} МБ: split() {tokenizer['split']:.1f} МБ/с, "
+          f"mmap {tokenizer['mmap']:.1f} МБ/с")
+
+
+def main():
+    """
+    Точка входа: запускает бенчмарк реализаций и выводит результаты в JSON
+    """
+    parser = argparse.ArgumentParser(description="Бенчмарк реализаций CalcTree2")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10, 100, 1000, 10000, 100000, 1000000],
+                        help="количества узлов в деревьях")
+    parser.add_argument("--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES))
+    parser.add_argument("--implementations", nargs="+", choices=list(IMPLEMENTATIONS),
+                        default=list(IMPLEMENTATIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="не измерять пиковую память")
+    parser.add_argument("--output", help="файл для JSON (по умолчанию - стандартный вывод)")
+    parser.add_argument("--micro", action="store_true",
+                        help="вместо сравнения реализаций напечатать отдельные замеры")
+    args = parser.parse_args()
+
+    if args.micro:
+        print_micro_benchmarks()
+        return
+
+    report = run_suite(args.sizes, args.shapes, args.implementations, args.seed,
+                       not args.no_memory)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
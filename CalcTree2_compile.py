@@ -0,0 +1,140 @@
+import hashlib
+from collections import OrderedDict
+
+from CalcTree2 import _OPERATION_SYMBOLS
+
+# Операторы Python для кодов операций
+_PYTHON_OPERATORS = {-1: '+', -2: '-', -3: '*', -4: '//'}
+
+# Скомпилированные функции по отпечатку дерева
+_COMPILED_CACHE = OrderedDict()
+COMPILED_CACHE_SIZE = 128
+
+
+def _iter_postorder(root):
+    """
+    Обходит дерево в порядке RPN без рекурсии
+
+    Yields:
+        NodeClass: Очередной узел (дети раньше родителя)
+    """
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node.left is None or expanded:
+            yield node
+        else:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+
+
+def leaf_values(root):
+    """
+    Возвращает значения листьев дерева слева направо
+
+    Это привязка листьев по умолчанию для функции из compile_tree.
+
+    Args:
+        root (NodeClass): Корень дерева
+
+    Returns:
+        list: Значения листьев
+    """
+    return [node.value for node in _iter_postorder(root) if node.left is None]
+
+
+def tree_fingerprint(root, bind_leaves=True):
+    """
+    Вычисляет отпечаток дерева для кеша скомпилированных функций
+
+    Args:
+        root (NodeClass): Корень дерева
+        bind_leaves (bool): Учитывать только форму дерева (листья - параметры),
+            иначе и значения листьев
+
+    Returns:
+        str: Шестнадцатеричный SHA-1 от записи дерева в RPN
+    """
+    digest = hashlib.sha1(b"bound" if bind_leaves else b"const")
+    tokens = []
+    for node in _iter_postorder(root):
+        if node.left is not None:
+            tokens.append(_OPERATION_SYMBOLS[node.value])
+        else:
+            tokens.append("x" if bind_leaves else str(node.value))
+        if len(tokens) >= 4096:
+            digest.update(" ".join(tokens).encode() + b" ")
+            tokens.clear()
+    digest.update(" ".join(tokens).encode())
+    return digest.hexdigest()
+
+
+def _generate_source(root, bind_leaves):
+    """
+    Генерирует исходный код функции, вычисляющей дерево
+
+    Код линейный, без вложенных выражений: значения держатся в локальных
+    переменных s0, s1, ..., по одной на уровень стека вычисления RPN.
+    Поэтому глубина дерева не ограничена лимитами парсера Python.
+    """
+    lines = ["def evaluate(x):" if bind_leaves else "def evaluate():"]
+    depth = 0
+    leaf_index = 0
+    for node in _iter_postorder(root):
+        if node.left is None:
+            source = f"x[{leaf_index}]" if bind_leaves else repr(node.value)
+            lines.append(f"    s{depth} = {source}")
+            depth += 1
+            leaf_index += 1
+        else:
+            depth -= 1
+            lines.append(f"    s{depth - 1} = s{depth - 1} {_PYTHON_OPERATORS[node.value]} s{depth}")
+    lines.append("    return s0")
+    return "\n".join(lines) + "\n"
+
+
+def compile_tree(root, bind_leaves=True, fingerprint=None):
+    """
+    Компилирует дерево выражения в функцию Python
+
+    Дерево (при необходимости заранее обработанное remove_additions)
+    превращается в одну функцию, так что повторное вычисление стоит
+    одного вызова вместо обхода дерева с выбором операции в каждом узле.
+    Функции кешируются по отпечатку дерева, поэтому деревья одинаковой
+    формы компилируются один раз.
+
+    Вычисление отпечатка обходит все дерево, так что даже попадание в кеш
+    стоит примерно как evaluate_tree. Для повторных вычислений нужно
+    сохранить возвращенную функцию, а не вызывать compile_tree снова,
+    либо один раз получить tree_fingerprint и передавать его в fingerprint.
+
+    Args:
+        root (NodeClass): Корень дерева
+        bind_leaves (bool): Если True, функция принимает последовательность
+            значений листьев (слева направо, см. leaf_values) и годится для
+            любых привязок при той же форме дерева. Если False, значения
+            листьев встраиваются в код и функция вызывается без аргументов.
+        fingerprint (str): Заранее вычисленный tree_fingerprint(root, bind_leaves);
+            при попадании в кеш дерево не обходится. Отпечаток другого
+            дерева вернет чужую функцию
+
+    Returns:
+        function: evaluate(x) или evaluate()
+    """
+    if fingerprint is None:
+        fingerprint = tree_fingerprint(root, bind_leaves)
+    function = _COMPILED_CACHE.get(fingerprint)
+    if function is not None:
+        _COMPILED_CACHE.move_to_end(fingerprint)
+        return function
+
+    code = compile(_generate_source(root, bind_leaves), f"<tree {fingerprint[:12]}>", "exec")
+    namespace = {}
+    exec(code, namespace)
+    function = namespace["evaluate"]
+
+    _COMPILED_CACHE[fingerprint] = function
+    if len(_COMPILED_CACHE) > COMPILED_CACHE_SIZE:
+        _COMPILED_CACHE.popitem(last=False)
+    return function
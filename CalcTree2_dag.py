@@ -0,0 +1,183 @@
+import time
+
+from CalcTree2 import (NodeClass, _OPERATION_CODES, _OPERATIONS, _is_number, build_expression_tree,
+                       evaluate_tree_iterative)
+
+
+def build_expression_dag(rpn_expression, table=None):
+    """
+    Строит из обратной польской записи граф выражения с общими подвыражениями
+
+    Структурно одинаковые поддеревья создаются один раз (hash-consing):
+    узел ищется в таблице по ключу (значение, левый ребенок, правый
+    ребенок), где дети уже сами взяты из таблицы. Узлы - обычные
+    NodeClass, поэтому граф можно передавать в функции для деревьев,
+    но изменять его нужно с учетом того, что узлы общие.
+
+    Args:
+        rpn_expression (str): Строка с выражением в RPN
+        table (dict): Таблица уже созданных узлов (для нескольких выражений)
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - root (NodeClass): Корень графа
+            - tree_nodes (int): Количество узлов в равносильном дереве
+    """
+    if table is None:
+        table = {}
+    stack = []
+    tree_nodes = 0
+    for token in rpn_expression.split():
+        tree_nodes += 1
+        if _is_number(token):
+            key = (int(token), None, None)
+            node = table.get(key)
+            if node is None:
+                node = table[key] = NodeClass(key[0])
+        else:
+            code = _OPERATION_CODES.get(token)
+            if code is None:
+                raise ValueError(f"Неизвестная операция: {token}")
+            right = stack.pop()
+            left = stack.pop()
+            key = (code, id(left), id(right))
+            node = table.get(key)
+            if node is None:
+                node = table[key] = NodeClass(code)
+                node.left = left
+                node.right = right
+        stack.append(node)
+    if len(stack) != 1:
+        raise ValueError("Некорректное выражение")
+    return stack.pop(), tree_nodes
+
+
+def evaluate_dag(root, memo=None):
+    """
+    Вычисляет значение графа выражения, вычисляя каждый общий узел один раз
+
+    Args:
+        root (NodeClass): Корень графа
+        memo (dict): Уже вычисленные значения узлов (узел -> значение)
+
+    Returns:
+        int: Результат вычисления
+    """
+    if memo is None:
+        memo = {}
+    stack = [root]
+    while stack:
+        node = stack[-1]
+        if node in memo:
+            stack.pop()
+        elif node.left is None:
+            memo[node] = node.value
+            stack.pop()
+        elif node.left in memo and node.right in memo:
+            memo[node] = _OPERATIONS[node.value](memo[node.left], memo[node.right])
+            stack.pop()
+        else:
+            stack.append(node.right)
+            stack.append(node.left)
+    return memo[root]
+
+
+def remove_additions_dag(root):
+    """
+    Удаляет операции сложения из графа выражения
+
+    Каждый общий узел преобразуется один раз, дети узлов заменяются
+    на месте. Значения детей сложения вычисляются evaluate_dag с общей
+    памятью, поэтому каждый узел вычисляется не более одного раза.
+    Полученные листы с одинаковыми значениями тоже общие.
+
+    Args:
+        root (NodeClass): Корень графа
+
+    Returns:
+        NodeClass: Новый корень графа (без операций сложения)
+    """
+    transformed = {}
+    memo = {}
+    leaves = {}
+    stack = [root]
+    while stack:
+        node = stack[-1]
+        if node in transformed:
+            stack.pop()
+        elif node.left is None:
+            transformed[node] = node
+            stack.pop()
+        elif node.left in transformed and node.right in transformed:
+            left = transformed[node.left]
+            right = transformed[node.right]
+            if node.value == -1:
+                value = evaluate_dag(left, memo) + evaluate_dag(right, memo)
+                leaf = leaves.get(value)
+                if leaf is None:
+                    leaf = leaves[value] = NodeClass(value)
+                transformed[node] = leaf
+            else:
+                node.left = left
+                node.right = right
+                transformed[node] = node
+            stack.pop()
+        else:
+            stack.append(node.right)
+            stack.append(node.left)
+    return transformed[root]
+
+
+def count_dag_nodes(root):
+    """
+    Считает различные узлы графа выражения
+
+    Args:
+        root (NodeClass): Корень графа
+
+    Returns:
+        int: Количество различных узлов
+    """
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+        if node.left is not None:
+            stack.append(node.left)
+            stack.append(node.right)
+    return len(seen)
+
+
+def compare_dag_evaluation(rpn_expression):
+    """
+    Сравнивает дерево и граф с общими подвыражениями для одного выражения
+
+    Args:
+        rpn_expression (str): Строка с выражением в RPN
+
+    Returns:
+        dict: Количество узлов дерева и графа, их отношение, время
+            вычисления дерева и графа и ускорение
+    """
+    tree = build_expression_tree(rpn_expression)
+    root, tree_nodes = build_expression_dag(rpn_expression)
+    dag_nodes = count_dag_nodes(root)
+
+    start = time.perf_counter()
+    evaluate_tree_iterative(tree)
+    tree_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    evaluate_dag(root)
+    dag_seconds = time.perf_counter() - start
+
+    return {
+        "tree_nodes": tree_nodes,
+        "dag_nodes": dag_nodes,
+        "node_reduction": tree_nodes / dag_nodes,
+        "tree_seconds": tree_seconds,
+        "dag_seconds": dag_seconds,
+        "speedup": tree_seconds / dag_seconds if dag_seconds else float("inf"),
+    }
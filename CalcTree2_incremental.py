@@ -0,0 +1,170 @@
+from CalcTree2 import NodeClass, _OPERATIONS, build_expression_tree
+
+
+class IncrementalNode(NodeClass):
+    """
+    Узел дерева выражения со ссылкой на родителя и запомненным значением
+
+    cached - значение поддерева или None, если при его вычислении
+    произошло деление на ноль.
+    """
+    def __init__(self, value):
+        super().__init__(value)
+        self.parent = None
+        self.cached = None
+        self.depth = 0
+
+
+def _compute(node):
+    """
+    Вычисляет значение внутреннего узла по запомненным значениям детей
+
+    Returns:
+        int: Значение или None, если оно неопределено
+    """
+    left_value = node.left.cached
+    right_value = node.right.cached
+    if left_value is None or right_value is None:
+        return None
+    try:
+        return _OPERATIONS[node.value](left_value, right_value)
+    except ZeroDivisionError:
+        return None
+
+
+class IncrementalTree:
+    """
+    Дерево выражения с инкрементальным пересчетом после изменения листьев
+
+    Каждый узел хранит значение своего поддерева, ссылку на родителя и
+    глубину; коды операций те же (-1..-4), что и в NodeClass. После
+    изменения листа пересчитываются только узлы на пути к корню (O(depth)),
+    причем пересчет останавливается, как только значение узла не изменилось.
+    Листья нумеруются слева направо, в порядке их следования в RPN.
+    """
+    def __init__(self, root):
+        """
+        Строит дерево по копии дерева из NodeClass
+
+        Args:
+            root (NodeClass): Корень исходного дерева (не изменяется)
+        """
+        self.leaves = []
+        results = []
+        # В стеке лежат исходные узлы и коды операций, ожидающие детей
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            if type(current) is int:
+                node = IncrementalNode(current)
+                node.right = results.pop()
+                node.left = results.pop()
+                node.left.parent = node
+                node.right.parent = node
+                node.cached = _compute(node)
+                results.append(node)
+            elif current.left is None:
+                node = IncrementalNode(current.value)
+                node.cached = current.value
+                self.leaves.append(node)
+                results.append(node)
+            else:
+                stack.append(current.value)
+                stack.append(current.right)
+                stack.append(current.left)
+        self.root = results.pop()
+
+        # Глубины задаются сверху вниз
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.left is not None:
+                node.left.depth = node.right.depth = node.depth + 1
+                stack.append(node.left)
+                stack.append(node.right)
+
+    @classmethod
+    def from_rpn(cls, rpn_expression):
+        """
+        Строит дерево из обратной польской записи
+
+        Args:
+            rpn_expression (str): Строка с выражением в RPN
+
+        Returns:
+            IncrementalTree: Построенное дерево
+        """
+        return cls(build_expression_tree(rpn_expression))
+
+    @property
+    def value(self):
+        """
+        Значение выражения
+
+        Raises:
+            ZeroDivisionError: Если при вычислении происходит деление на ноль
+        """
+        if self.root.cached is None:
+            raise ZeroDivisionError("integer division or modulo by zero")
+        return self.root.cached
+
+    def set_leaf(self, index, value):
+        """
+        Изменяет значение листа и пересчитывает путь к корню
+
+        Args:
+            index (int): Номер листа (слева направо)
+            value (int): Новое значение
+
+        Returns:
+            int: Количество пересчитанных узлов
+        """
+        leaf = self.leaves[index]
+        leaf.value = leaf.cached = value
+        recomputed = 0
+        node = leaf.parent
+        while node is not None:
+            new_value = _compute(node)
+            recomputed += 1
+            if new_value == node.cached:
+                break
+            node.cached = new_value
+            node = node.parent
+        return recomputed
+
+    def update_leaves(self, updates):
+        """
+        Изменяет значения нескольких листьев и пересчитывает дерево
+        одним проходом снизу вверх
+
+        Общие предки измененных листьев пересчитываются один раз: узлы,
+        требующие пересчета, собираются по уровням и обрабатываются от
+        самого глубокого уровня к корню.
+
+        Args:
+            updates: Словарь или последовательность пар (номер листа, значение)
+
+        Returns:
+            int: Количество пересчитанных узлов
+        """
+        if isinstance(updates, dict):
+            updates = updates.items()
+        levels = {}
+        for index, value in updates:
+            leaf = self.leaves[index]
+            leaf.value = leaf.cached = value
+            parent = leaf.parent
+            if parent is not None:
+                levels.setdefault(parent.depth, {})[id(parent)] = parent
+
+        recomputed = 0
+        for depth in range(max(levels, default=-1), -1, -1):
+            for node in levels.pop(depth, {}).values():
+                new_value = _compute(node)
+                recomputed += 1
+                if new_value == node.cached:
+                    continue
+                node.cached = new_value
+                if node.parent is not None:
+                    levels.setdefault(depth - 1, {})[id(node.parent)] = node.parent
+        return recomputed
@@ -0,0 +1,132 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from CalcTree2 import _OPERATIONS
+from CalcTree2_array import NO_CHILD, evaluate_array_tree
+
+# Размер дерева, начиная с которого вычисление распараллеливается
+PARALLEL_THRESHOLD = 1000000
+
+
+def _evaluate_encoded(values, lefts):
+    """
+    Вычисляет поддерево в компактной кодировке (выполняется в процессе пула)
+
+    Поддерево ArrayTree занимает непрерывный отрезок массивов и является
+    записью в RPN, поэтому для вычисления достаточно срезов values и lefts
+    (lefts нужен только чтобы отличить лист). Срезы array('q') передаются
+    между процессами как байты - 16 байт на узел.
+
+    Args:
+        values (array): Срез значений/кодов операций
+        lefts (array): Срез индексов левых детей (NO_CHILD у листа)
+
+    Returns:
+        int: Значение поддерева
+    """
+    stack = []
+    for i in range(len(values)):
+        if lefts[i] == NO_CHILD:
+            stack.append(values[i])
+        else:
+            right_value = stack.pop()
+            stack[-1] = _OPERATIONS[values[i]](stack[-1], right_value)
+    return stack.pop()
+
+
+def _encode(buffer, start, stop):
+    """
+    Возвращает срез массива дерева как array('q'), пригодный для pickle
+
+    У дерева, загруженного load_array_tree, массивы - срезы memoryview,
+    которые нельзя передать в другой процесс, поэтому они копируются.
+    """
+    chunk = buffer[start:stop]
+    if isinstance(chunk, array):
+        return chunk
+    return array('q', chunk.tobytes())
+
+
+def choose_frontier(tree, target_size):
+    """
+    Выбирает независимые поддеревья для параллельного вычисления
+
+    Дерево обходится сверху вниз, пока размер поддерева больше
+    target_size. Отрезок поддерева известен без обхода: левый ребенок
+    начинается там же, где родитель, а правый - сразу после левого.
+
+    Args:
+        tree (ArrayTree): Дерево выражения
+        target_size (int): Наибольший размер поддерева-задачи
+
+    Returns:
+        list: Пары (начало, конец) отрезков поддеревьев размером от
+            target_size // 4 до target_size, по возрастанию
+    """
+    frontier = []
+    lefts = tree.lefts
+    stack = [(tree.root, 0)]
+    while stack:
+        node, start = stack.pop()
+        size = node - start + 1
+        if size <= target_size:
+            if size >= target_size // 4:
+                frontier.append((start, node))
+        elif lefts[node] != NO_CHILD:
+            left = lefts[node]
+            stack.append((tree.rights[node], left + 1))
+            stack.append((left, start))
+    frontier.sort()
+    return frontier
+
+
+def evaluate_array_tree_parallel(tree, workers=None, threshold=PARALLEL_THRESHOLD,
+                                 tasks_per_worker=4):
+    """
+    Вычисляет большое ArrayTree в пуле процессов
+
+    Дерево разбивается на независимые поддеревья (около tasks_per_worker
+    на процесс), которые вычисляются параллельно, а затем верхняя часть
+    дерева вычисляется в текущем процессе с подстановкой их значений.
+    Деревья меньше threshold узлов вычисляются последовательно.
+    Выигрыш есть только у сбалансированных деревьев: у вырожденных
+    (например, левосторонних) независимых поддеревьев почти нет.
+
+    Args:
+        tree (ArrayTree): Дерево выражения
+        workers (int): Количество процессов (по умолчанию - число ядер)
+        threshold (int): Наименьший размер дерева для параллельного вычисления
+        tasks_per_worker (int): Количество поддеревьев на процесс
+
+    Returns:
+        int: Результат вычисления
+    """
+    workers = workers or os.cpu_count() or 1
+    if len(tree) < threshold or workers == 1:
+        return evaluate_array_tree(tree)
+
+    frontier = choose_frontier(tree, max(1, len(tree) // (workers * tasks_per_worker)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_evaluate_encoded, _encode(tree.values, start, end + 1),
+                                   _encode(tree.lefts, start, end + 1))
+                   for start, end in frontier]
+        results = [future.result() for future in futures]
+
+    values, lefts = tree.values, tree.lefts
+    stack = []
+    task = 0
+    i = 0
+    while i < len(values):
+        if task < len(frontier) and i == frontier[task][0]:
+            stack.append(results[task])
+            i = frontier[task][1] + 1
+            task += 1
+            continue
+        if lefts[i] == NO_CHILD:
+            stack.append(values[i])
+        else:
+            right_value = stack.pop()
+            stack[-1] = _OPERATIONS[values[i]](stack[-1], right_value)
+        i += 1
+    return stack.pop()
@@ -0,0 +1,209 @@
+from CalcTree2 import NodeClass, _OPERATIONS, evaluate_tree_iterative
+
+
+def _is_constant(node):
+    """Проверяет, является ли узел листом-числом (а не операцией или переменной)"""
+    return node.left is None and type(node.value) is int
+
+
+def _is_constant_equal(node, value):
+    """Проверяет, является ли узел листом-числом value"""
+    return _is_constant(node) and node.value == value
+
+
+class RewritePass:
+    """
+    Проход оптимизации дерева выражения
+
+    Конвейер вызывает rewrite для каждого узла-операции после того,
+    как его дети уже обработаны всеми проходами. Проход возвращает
+    узел, которым нужно заменить текущий, или None, если узел не меняется.
+    """
+    name = "pass"
+
+    def rewrite(self, node):
+        """
+        Args:
+            node (NodeClass): Узел-операция с уже обработанными детьми
+
+        Returns:
+            NodeClass: Узел-замена или None
+        """
+        return None
+
+
+class AdditionFoldingPass(RewritePass):
+    """
+    Заменяет сложение вычисленным значением поддерева, как remove_additions
+
+    Вычисляет поддеревья целиком, поэтому применим только к деревьям
+    без переменных.
+    """
+    name = "remove_additions"
+
+    def rewrite(self, node):
+        if node.value != -1:
+            return None
+        return NodeClass(evaluate_tree_iterative(node.left) + evaluate_tree_iterative(node.right))
+
+
+class ConstantFoldingPass(RewritePass):
+    """
+    Вычисляет любую операцию над двумя числами
+
+    Деление на ноль не сворачивается: узел остается в дереве,
+    и ошибка возникнет при вычислении, как без оптимизации.
+    """
+    name = "constant_folding"
+
+    def rewrite(self, node):
+        if not (_is_constant(node.left) and _is_constant(node.right)):
+            return None
+        try:
+            return NodeClass(_OPERATIONS[node.value](node.left.value, node.right.value))
+        except ZeroDivisionError:
+            return None
+
+
+class IdentityPass(RewritePass):
+    """
+    Убирает нейтральные операции: x+0, 0+x, x-0, x*1, 1*x, x/1
+    """
+    name = "identity"
+
+    def rewrite(self, node):
+        code, left, right = node.value, node.left, node.right
+        if code == -1 and _is_constant_equal(left, 0):
+            return right
+        if code in (-1, -2) and _is_constant_equal(right, 0):
+            return left
+        if code == -3 and _is_constant_equal(left, 1):
+            return right
+        if code in (-3, -4) and _is_constant_equal(right, 1):
+            return left
+        return None
+
+
+class ZeroAnnihilationPass(RewritePass):
+    """
+    Заменяет x*0 и 0*x нулем
+
+    Поддерево x при этом не вычисляется, поэтому деление на ноль
+    внутри него перестает быть ошибкой.
+    """
+    name = "zero_annihilation"
+
+    def rewrite(self, node):
+        if node.value == -3 and (_is_constant_equal(node.left, 0)
+                                 or _is_constant_equal(node.right, 0)):
+            return NodeClass(0)
+        return None
+
+
+class StrengthReductionPass(RewritePass):
+    """
+    Заменяет умножение более дешевыми операциями:
+    x*2 и 2*x - на x+x (для листа x), x*-1 и -1*x - на 0-x
+    """
+    name = "strength_reduction"
+
+    def rewrite(self, node):
+        if node.value != -3:
+            return None
+        for operand, factor in ((node.left, node.right), (node.right, node.left)):
+            if _is_constant_equal(factor, 2) and operand.left is None:
+                result = NodeClass(-1)
+                result.left = operand
+                result.right = NodeClass(operand.value)
+                return result
+            if _is_constant_equal(factor, -1):
+                result = NodeClass(-2)
+                result.left = NodeClass(0)
+                result.right = operand
+                return result
+        return None
+
+
+class PassPipeline:
+    """
+    Конвейер проходов оптимизации, выполняемых за один обход дерева
+
+    Дерево обходится один раз в обратном порядке без рекурсии. Для каждого
+    узла-операции зарегистрированные проходы применяются по очереди:
+    если проход заменил узел, следующие проходы работают уже с заменой.
+    statistics хранит для каждого прохода количество вызовов и замен.
+    """
+    def __init__(self, passes):
+        """
+        Args:
+            passes (list): Проходы (экземпляры RewritePass) в порядке применения
+        """
+        self.passes = list(passes)
+        self.statistics = {}
+        self.reset_statistics()
+
+    def reset_statistics(self):
+        """Обнуляет статистику проходов"""
+        self.statistics = {rewrite_pass.name: {"calls": 0, "rewrites": 0}
+                           for rewrite_pass in self.passes}
+
+    def _rewrite(self, node):
+        """Применяет проходы к одному узлу"""
+        for rewrite_pass in self.passes:
+            if node.left is None:
+                break
+            stats = self.statistics[rewrite_pass.name]
+            stats["calls"] += 1
+            replacement = rewrite_pass.rewrite(node)
+            if replacement is not None:
+                stats["rewrites"] += 1
+                node = replacement
+        return node
+
+    def run(self, root):
+        """
+        Оптимизирует дерево (узлы изменяются на месте)
+
+        Args:
+            root (NodeClass): Корень дерева
+
+        Returns:
+            NodeClass: Новый корень дерева
+        """
+        results = []
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node.left is None:
+                results.append(node)
+            elif not expanded:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                node.right = results.pop()
+                node.left = results.pop()
+                results.append(self._rewrite(node))
+        return results.pop()
+
+
+def simplifier_pipeline():
+    """
+    Конвейер алгебраического упрощения: свертка констант, умножение
+    на ноль, нейтральные операции и снижение стоимости операций
+
+    Returns:
+        PassPipeline: Новый конвейер
+    """
+    return PassPipeline([ConstantFoldingPass(), ZeroAnnihilationPass(),
+                         IdentityPass(), StrengthReductionPass()])
+
+
+def remove_additions_pipeline():
+    """
+    Конвейер, в точности повторяющий remove_additions
+
+    Returns:
+        PassPipeline: Новый конвейер
+    """
+    return PassPipeline([AdditionFoldingPass()])
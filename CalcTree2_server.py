@@ -0,0 +1,264 @@
+import asyncio
+import json
+import os
+import socket
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from CalcTree2 import build_expression_tree, evaluate_tree_iterative, remove_additions_fused, tree_to_rpn
+
+DEFAULT_SOCKET_PATH = "calc_tree.sock"
+
+# Наибольшая длина строки запроса (байт); более длинные строки
+# пропускаются с ответом ERR
+DEFAULT_LINE_LIMIT = 16 * 1024 * 1024
+
+# Выражения от этой длины (символов) вычисляются в пуле процессов,
+# чтобы не останавливать цикл событий
+DEFAULT_OFFLOAD_THRESHOLD = 64 * 1024
+
+
+def _solve_key(key):
+    """
+    Вычисляет ответ на нормализованное выражение без кеша
+    (выполняется и в процессе пула)
+
+    Args:
+        key (str): Непустое выражение в RPN с токенами через один пробел
+
+    Returns:
+        bytes: Строка ответа с переводом строки
+    """
+    try:
+        root = remove_additions_fused(build_expression_tree(key))
+        return f"OK {tree_to_rpn(root)}\t{evaluate_tree_iterative(root)}\n".encode()
+    except Exception as e:
+        return f"ERR {e}\n".encode()
+
+
+async def _skip_line(reader):
+    """
+    Пропускает остаток слишком длинной строки до перевода строки включительно
+    """
+    while True:
+        try:
+            await reader.readuntil(b"\n")
+            return
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+
+class LRUCache:
+    """
+    Ограниченный кеш с вытеснением давно не использованных записей
+    """
+    def __init__(self, maxsize):
+        """
+        Args:
+            maxsize (int): Наибольшее количество записей
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Возвращает запись по ключу или None
+
+        Args:
+            key: Ключ записи
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        Добавляет запись, вытесняя самую старую при переполнении
+
+        Args:
+            key: Ключ записи
+            value: Значение (не None)
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: Размер кеша, количество попаданий, промахов и вытеснений
+        """
+        return {"size": len(self.entries), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+class CalcTreeServer:
+    """
+    Сервис вычисления выражений на Unix-сокете
+
+    Протокол строковый: клиент присылает выражения в RPN, по одному
+    на строке, и получает ответы в том же порядке:
+    "OK <преобразованное выражение в RPN>\\t<значение>" или "ERR <сообщение>".
+    Строка "STATS" возвращает "STATS <статистика кеша в JSON>".
+    Клиент может отправлять запросы, не дожидаясь ответов на предыдущие.
+    Ответы кешируются по нормализованной последовательности токенов.
+    Строки длиннее line_limit байт получают ответ "ERR ...", обработка
+    соединения продолжается со следующей строки.
+    """
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, cache_size=10000,
+                 line_limit=DEFAULT_LINE_LIMIT, offload_threshold=DEFAULT_OFFLOAD_THRESHOLD,
+                 workers=None):
+        """
+        Args:
+            socket_path (str): Путь к Unix-сокету
+            cache_size (int): Наибольшее количество кешированных ответов
+            line_limit (int): Наибольшая длина строки запроса в байтах
+            offload_threshold (int): Длина выражения, начиная с которой
+                промах кеша вычисляется в пуле процессов
+            workers (int): Количество процессов пула (по умолчанию - число ядер)
+        """
+        self.socket_path = socket_path
+        self.cache = LRUCache(cache_size)
+        self.line_limit = line_limit
+        self.offload_threshold = offload_threshold
+        self.workers = workers
+        self.executor = None
+
+    def solve(self, rpn_expression):
+        """
+        Возвращает ответ на одно выражение, используя кеш
+
+        Args:
+            rpn_expression (str): Выражение в RPN
+
+        Returns:
+            bytes: Строка ответа с переводом строки
+        """
+        key = " ".join(rpn_expression.split())
+        if not key:
+            return "ERR Пустое выражение\n".encode()
+        response = self.cache.get(key)
+        if response is None:
+            response = _solve_key(key)
+            self.cache.put(key, response)
+        return response
+
+    async def solve_async(self, rpn_expression):
+        """
+        То же, что solve, но промах кеша для выражения от offload_threshold
+        символов вычисляется в пуле процессов, не занимая цикл событий
+
+        Args:
+            rpn_expression (str): Выражение в RPN
+
+        Returns:
+            bytes: Строка ответа с переводом строки
+        """
+        key = " ".join(rpn_expression.split())
+        if self.executor is None or len(key) < self.offload_threshold:
+            return self.solve(key)
+        response = self.cache.get(key)
+        if response is None:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self.executor, _solve_key, key)
+            self.cache.put(key, response)
+        return response
+
+    async def handle_connection(self, reader, writer):
+        """
+        Обслуживает одно соединение: отвечает на запросы по порядку
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    # Последняя строка без перевода строки
+                    line = e.partial
+                    if not line:
+                        break
+                except asyncio.LimitOverrunError:
+                    await _skip_line(reader)
+                    writer.write(f"ERR Строка длиннее {self.line_limit} байт\n".encode())
+                    await writer.drain()
+                    continue
+                text = line.decode(errors="replace").strip()
+                if text == "STATS":
+                    writer.write(f"STATS {json.dumps(self.cache.stats())}\n".encode())
+                else:
+                    writer.write(await self.solve_async(text))
+                await writer.drain()
+        except ConnectionResetError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        """
+        Запускает сервис и обслуживает соединения до остановки
+        """
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            self.executor = executor
+            try:
+                server = await asyncio.start_unix_server(self.handle_connection, path=self.socket_path,
+                                                         limit=self.line_limit)
+                async with server:
+                    await server.serve_forever()
+            finally:
+                self.executor = None
+
+
+def query(expressions, socket_path=DEFAULT_SOCKET_PATH, batch_size=256):
+    """
+    Отправляет выражения сервису пакетами и возвращает ответы
+
+    Запросы пакета отправляются одной записью, не дожидаясь ответов;
+    пакеты ограничены batch_size, чтобы буферы сокета не переполнялись.
+
+    Args:
+        expressions (list): Выражения в RPN
+        socket_path (str): Путь к Unix-сокету сервиса
+        batch_size (int): Количество запросов в пакете
+
+    Returns:
+        list: Строки ответов (без перевода строки) в порядке выражений
+    """
+    responses = []
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile("rb") as f:
+            for start in range(0, len(expressions), batch_size):
+                batch = expressions[start:start + batch_size]
+                client.sendall("".join(expression.replace("\n", " ") + "\n"
+                                       for expression in batch).encode())
+                responses.extend(f.readline().decode().rstrip("\n") for _ in batch)
+    return responses
+
+
+def main():
+    """
+    Точка входа: запускает сервис на сокете по умолчанию
+    """
+    server = CalcTreeServer()
+    print(f"Сервис запущен на сокете '{server.socket_path}'")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import re
+
+import numpy as np
+
+from CalcTree2 import NodeClass, _OPERATION_CODES, _is_number, evaluate_tree_iterative
+
+# Имя переменной: буква или подчеркивание, затем буквы, цифры, подчеркивания
+_VARIABLE_NAME = re.compile(r'[A-Za-z_]\w*\Z')
+
+# Векторные операции NumPy для кодов операций
+_NUMPY_OPERATIONS = {
+    -1: np.add,
+    -2: np.subtract,
+    -3: np.multiply,
+    -4: np.floor_divide,
+}
+
+
+def build_expression_tree_with_variables(rpn_expression):
+    """
+    Строит дерево выражения с переменными из обратной польской записи
+
+    Кроме целых чисел допускаются имена переменных ("x", "price_2"):
+    value такого листа - строка с именем.
+
+    Args:
+        rpn_expression (str): Строка с выражением в RPN (например "x 4 + y *")
+
+    Returns:
+        NodeClass: Указатель на корень построенного дерева
+    """
+    stack = []
+    for token in rpn_expression.split():
+        if _is_number(token):
+            stack.append(NodeClass(int(token)))
+        elif _VARIABLE_NAME.match(token):
+            stack.append(NodeClass(token))
+        else:
+            code = _OPERATION_CODES.get(token)
+            if code is None:
+                raise ValueError(f"Неизвестная операция: {token}")
+            if len(stack) < 2:
+                raise ValueError("Некорректное выражение")
+            node = NodeClass(code)
+            node.right = stack.pop()
+            node.left = stack.pop()
+            stack.append(node)
+    if len(stack) != 1:
+        raise ValueError("Некорректное выражение")
+    return stack.pop()
+
+
+def _floor_divide(left, right, zero_division):
+    """
+    Целочисленное деление массивов с заданной обработкой деления на ноль
+    """
+    zero = right == 0
+    if not np.any(zero):
+        return np.floor_divide(left, right)
+    if zero_division == "raise":
+        raise ZeroDivisionError("integer division or modulo by zero")
+    result = np.floor_divide(left, np.where(zero, 1, right))
+    return np.where(zero, np.int64(zero_division), result)
+
+
+def evaluate_vectorized(root, bindings, zero_division="raise"):
+    """
+    Вычисляет выражение сразу для всех строк значений переменных
+
+    Каждому узлу дерева соответствует одна векторная операция NumPy,
+    поэтому весь набор строк обрабатывается за один обход дерева.
+    Вычисления ведутся в int64: переполнение, как обычно в NumPy,
+    не проверяется.
+
+    Args:
+        root (NodeClass): Корень дерева (см. build_expression_tree_with_variables)
+        bindings (dict): Имя переменной -> массив значений (одинаковой длины)
+        zero_division: "raise" - при делении на ноль в любой строке возбуждается
+            ZeroDivisionError; целое число - результат деления на ноль
+            в соответствующих строках
+
+    Returns:
+        numpy.ndarray: Значения выражения для каждой строки
+            (скаляр, если в выражении нет переменных)
+
+    Raises:
+        KeyError: Если для переменной не передан массив
+        ZeroDivisionError: При делении на ноль и zero_division="raise"
+    """
+    values = []
+    # В стеке лежат узлы для обхода и коды операций, ожидающие операндов
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        if type(current) is int:
+            right_value = values.pop()
+            left_value = values[-1]
+            if current == -4:
+                values[-1] = _floor_divide(left_value, right_value, zero_division)
+            else:
+                values[-1] = _NUMPY_OPERATIONS[current](left_value, right_value)
+        elif current.left is None:
+            if type(current.value) is str:
+                values.append(np.asarray(bindings[current.value], dtype=np.int64))
+            else:
+                values.append(np.int64(current.value))
+        else:
+            stack.append(current.value)
+            stack.append(current.right)
+            stack.append(current.left)
+    return values.pop()
+
+
+def remove_additions_with_variables(root):
+    """
+    Удаляет операции сложения, оба операнда которых не зависят от переменных
+
+    Сложение с переменной в одном из поддеревьев остается в дереве.
+    Для деревьев без переменных результат совпадает с remove_additions.
+
+    Args:
+        root (NodeClass): Корень дерева (или поддерева)
+
+    Returns:
+        NodeClass: Новый корень поддерева
+    """
+    # Элементы results - (новый узел, не зависит ли поддерево от переменных)
+    results = []
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node.left is None:
+            results.append((node, type(node.value) is not str))
+        elif not expanded:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+        else:
+            node.right, right_constant = results.pop()
+            node.left, left_constant = results.pop()
+            constant = left_constant and right_constant
+            if node.value == -1 and constant:
+                value = evaluate_tree_iterative(node.left) + evaluate_tree_iterative(node.right)
+                results.append((NodeClass(value), True))
+            else:
+                results.append((node, constant))
+    return results.pop()[0]
@@ -1,3 +1,27 @@
+import mmap
+import os
+import re
+import struct
+import tempfile
+from array import array
+from itertools import compress, repeat
+
+# Форматы вывода матрицы инцидентности
+INCIDENCE_FORMATS = ("dense", "edges", "coo", "csr")
+
+# Двоичный формат матрицы смежности: заголовок (сигнатура, версия, n),
+# затем строки верхнего треугольника, упакованные по битам
+_BINARY_MAGIC = b"G2AB"
+_BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct("<4sIQ")
+
+# Номера установленных битов для каждого значения байта
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+# Отрезки ненулевых байтов
+_NONZERO_BYTES = re.compile(rb"[^\x00]+")
+
+
 def read_adjacency_matrix(filename):
     """
     Читает матрицу смежности из файла.
@@ -25,6 +49,104 @@ def read_adjacency_matrix(filename):
     return n, matrix
 
 
+def build_edge_list(n, adjacency):
+    """
+    Собирает ребра неориентированного графа из матрицы смежности.
+
+    Args:
+        n (int): Количество вершин в графе.
+        adjacency (list): Матрица смежности (список списков целых чисел).
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - edge_u (array): Меньшие концы ребер.
+            - edge_v (array): Большие концы ребер.
+
+    Note:
+        Ребро (i, j), i < j, берется из верхнего треугольника матрицы.
+        Номер ребра - его позиция при обходе треугольника по строкам,
+        то есть номер столбца в матрице инцидентности. Концы хранятся
+        в array('q'), по 16 байт на ребро.
+    """
+    edge_u = array('q')
+    edge_v = array('q')
+    # Собираем ребра (только верхний треугольник матрицы, чтобы избежать дублирования)
+    for i in range(n):
+        row = adjacency[i]
+        for j in range(i + 1, n):
+            if row[j] != 0:
+                edge_u.append(i)
+                edge_v.append(j)
+    return edge_u, edge_v
+
+
+def build_incidence_coo(n, edge_u, edge_v):
+    """
+    Строит матрицу инцидентности в координатном формате (COO).
+
+    Args:
+        n (int): Количество вершин в графе.
+        edge_u (array): Меньшие концы ребер.
+        edge_v (array): Большие концы ребер.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - rows (array): Номера строк (вершин) ненулевых элементов.
+            - cols (array): Номера столбцов (ребер) ненулевых элементов.
+
+    Note:
+        Все ненулевые элементы равны 1, поэтому значения не хранятся.
+        Элементы упорядочены по столбцам: у столбца e это (edge_u[e], e)
+        и (edge_v[e], e).
+    """
+    m = len(edge_u)
+    rows = array('q', bytes(16 * m))
+    rows[0::2] = edge_u
+    rows[1::2] = edge_v
+    cols = array('q', bytes(16 * m))
+    cols[0::2] = cols[1::2] = array('q', range(m))
+    return rows, cols
+
+
+def build_incidence_csr(n, edge_u, edge_v):
+    """
+    Строит матрицу инцидентности в сжатом построчном формате (CSR).
+
+    Args:
+        n (int): Количество вершин в графе.
+        edge_u (array): Меньшие концы ребер.
+        edge_v (array): Большие концы ребер.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - indptr (array): Смещения строк, длина n + 1.
+            - indices (array): Номера ребер; ребра вершины u -
+              indices[indptr[u]:indptr[u + 1]] по возрастанию.
+
+    Note:
+        Строится за O(n + m): подсчет степеней, префиксные суммы
+        и раскладка ребер в порядке возрастания их номеров.
+    """
+    m = len(edge_u)
+    indptr = array('q', bytes(8 * (n + 1)))
+    for e in range(m):
+        indptr[edge_u[e] + 1] += 1
+        indptr[edge_v[e] + 1] += 1
+    for u in range(n):
+        indptr[u + 1] += indptr[u]
+
+    fill = array('q', indptr[:n])
+    indices = array('q', bytes(16 * m))
+    for e in range(m):
+        u = edge_u[e]
+        indices[fill[u]] = e
+        fill[u] += 1
+        v = edge_v[e]
+        indices[fill[v]] = e
+        fill[v] += 1
+    return indptr, indices
+
+
 def build_incidence_matrix(n, adjacency):
     """
     Преобразует матрицу смежности в матрицу инцидентности для неориентированного графа.
@@ -43,19 +165,14 @@ def build_incidence_matrix(n, adjacency):
         представляется один раз (i < j), а в матрице инцидентности
         соответствующий столбец содержит 1 в строках i и j.
     """
-    edges = []
-    # Собираем ребра (только верхний треугольник матрицы, чтобы избежать дублирования)
-    for i in range(n):
-        for j in range(i + 1, n):
-            if adjacency[i][j] != 0:
-                edges.append((i, j))
+    edge_u, edge_v = build_edge_list(n, adjacency)
 
-    m = len(edges)
+    m = len(edge_u)
     incidence = [[0] * m for _ in range(n)]
 
-    for edge_idx, (u, v) in enumerate(edges):
-        incidence[u][edge_idx] = 1
-        incidence[v][edge_idx] = 1
+    for edge_idx in range(m):
+        incidence[edge_u[edge_idx]][edge_idx] = 1
+        incidence[edge_v[edge_idx]][edge_idx] = 1
 
     return m, incidence
 
@@ -70,13 +187,712 @@ def write_incidence_matrix(filename, n, m, incidence):
         m (int): Количество ребер в графе.
         incidence (list): Матрица инцидентности (список списков целых чисел).
 
+    Raises:
+        IOError: Если возникла ошибка при записи в файл.
+
+    Note:
+        Элементы матрицы должны быть 0 или 1: строки выводятся через
+        write_incidence_rows по номерам единичных элементов.
+    """
+    with open(filename, "wb") as f:
+        f.write(f"{n} {m}\n".encode())
+        write_incidence_rows(f, m, (compress(range(m), row) for row in incidence))
+
+
+def write_incidence_rows(file, m, rows):
+    """
+    Записывает строки полной матрицы инцидентности по номерам ребер.
+
+    Строка собирается в заранее выделенном шаблоне bytearray "0 0 ... 0\\n":
+    в позиции 2 * e инцидентных ребер ставится b"1", строка записывается
+    одним вызовом write, после чего шаблон восстанавливается на месте.
+    Работа на строку - O(m) байт копирования и O(степени) операций Python,
+    а не m строковых объектов.
+
+    Args:
+        file: Файл, открытый для записи в двоичном режиме.
+        m (int): Количество ребер в графе.
+        rows: Последовательность строк; строка - номера ребер,
+            инцидентных вершине.
+
+    Raises:
+        IOError: Если возникла ошибка при записи в файл.
+    """
+    line = bytearray(b"0 " * m) if m else bytearray(b" ")
+    line[-1] = ord("\n")
+    one, zero = ord("1"), ord("0")
+    for edges in rows:
+        positions = [2 * e for e in edges]
+        for position in positions:
+            line[position] = one
+        file.write(line)
+        for position in positions:
+            line[position] = zero
+
+
+def _read_header(file, count):
+    """
+    Читает строку заголовка из count целых чисел.
+
+    Raises:
+        ValueError: Если заголовок некорректен.
+    """
+    header = file.readline().split()
+    if len(header) != count:
+        raise ValueError("Некорректный заголовок файла")
+    return [int(token) for token in header]
+
+
+def _write_lines(file, lines, batch_size=65536):
+    """
+    Записывает строки пакетами, не собирая весь вывод в памяти.
+    """
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            file.write("\n".join(batch) + "\n")
+            batch.clear()
+    if batch:
+        file.write("\n".join(batch) + "\n")
+
+
+def write_edge_list(filename, n, edge_u, edge_v):
+    """
+    Записывает список ребер в файл.
+
+    Первая строка - "n m", далее по строке "u v" на каждое ребро
+    в порядке номеров ребер (вершины нумеруются с нуля).
+
+    Args:
+        filename (str): Имя файла для записи.
+        n (int): Количество вершин в графе.
+        edge_u (array): Меньшие концы ребер.
+        edge_v (array): Большие концы ребер.
+
+    Raises:
+        IOError: Если возникла ошибка при записи в файл.
+    """
+    with open(filename, "w") as f:
+        f.write(f"{n} {len(edge_u)}\n")
+        _write_lines(f, (f"{u} {v}" for u, v in zip(edge_u, edge_v)))
+
+
+def read_edge_list(filename):
+    """
+    Читает список ребер, записанный write_edge_list.
+
+    Args:
+        filename (str): Имя файла со списком ребер.
+
+    Returns:
+        tuple: Кортеж из трех элементов:
+            - n (int): Количество вершин в графе.
+            - edge_u (array): Меньшие концы ребер.
+            - edge_v (array): Большие концы ребер.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если данные в файле некорректны.
+    """
+    edge_u = array('q')
+    edge_v = array('q')
+    with open(filename, "r") as file:
+        n, m = _read_header(file, 2)
+        for _ in range(m):
+            edge = file.readline().split()
+            if len(edge) != 2:
+                raise ValueError("Некорректный формат списка ребер")
+            u, v = int(edge[0]), int(edge[1])
+            if not 0 <= u < v < n:
+                raise ValueError(f"Некорректное ребро: {u} {v}")
+            edge_u.append(u)
+            edge_v.append(v)
+    return n, edge_u, edge_v
+
+
+def write_incidence_coo(filename, n, m, rows, cols):
+    """
+    Записывает матрицу инцидентности в координатном формате.
+
+    Первая строка - "n m nnz", далее по строке "строка столбец"
+    на каждый ненулевой элемент.
+
+    Args:
+        filename (str): Имя файла для записи.
+        n (int): Количество вершин в графе.
+        m (int): Количество ребер в графе.
+        rows (array): Номера строк ненулевых элементов.
+        cols (array): Номера столбцов ненулевых элементов.
+
+    Raises:
+        IOError: Если возникла ошибка при записи в файл.
+    """
+    with open(filename, "w") as f:
+        f.write(f"{n} {m} {len(rows)}\n")
+        _write_lines(f, (f"{row} {col}" for row, col in zip(rows, cols)))
+
+
+def read_incidence_coo(filename):
+    """
+    Читает матрицу инцидентности, записанную write_incidence_coo.
+
+    Args:
+        filename (str): Имя файла с матрицей в координатном формате.
+
+    Returns:
+        tuple: Кортеж из четырех элементов:
+            - n (int): Количество вершин в графе.
+            - m (int): Количество ребер в графе.
+            - rows (array): Номера строк ненулевых элементов.
+            - cols (array): Номера столбцов ненулевых элементов.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если данные в файле некорректны.
+    """
+    rows = array('q')
+    cols = array('q')
+    with open(filename, "r") as file:
+        n, m, nnz = _read_header(file, 3)
+        for _ in range(nnz):
+            entry = file.readline().split()
+            if len(entry) != 2:
+                raise ValueError("Некорректный формат матрицы инцидентности")
+            row, col = int(entry[0]), int(entry[1])
+            if not (0 <= row < n and 0 <= col < m):
+                raise ValueError(f"Элемент вне матрицы: {row} {col}")
+            rows.append(row)
+            cols.append(col)
+    return n, m, rows, cols
+
+
+def write_incidence_csr(filename, n, m, indptr, indices):
+    """
+    Записывает матрицу инцидентности в сжатом построчном формате.
+
+    Первая строка - "n m", далее n строк: номера ребер, инцидентных
+    очередной вершине, через пробел (пустая строка у изолированной вершины).
+
+    Args:
+        filename (str): Имя файла для записи.
+        n (int): Количество вершин в графе.
+        m (int): Количество ребер в графе.
+        indptr (array): Смещения строк, длина n + 1.
+        indices (array): Номера ребер по строкам.
+
     Raises:
         IOError: Если возникла ошибка при записи в файл.
     """
     with open(filename, "w") as f:
         f.write(f"{n} {m}\n")
-        for row in incidence:
-            f.write(" ".join(map(str, row)) + "\n")
+        _write_lines(f, (" ".join(map(str, indices[indptr[u]:indptr[u + 1]]))
+                         for u in range(n)))
+
+
+def read_incidence_csr(filename):
+    """
+    Читает матрицу инцидентности, записанную write_incidence_csr.
+
+    Args:
+        filename (str): Имя файла с матрицей в сжатом построчном формате.
+
+    Returns:
+        tuple: Кортеж из четырех элементов:
+            - n (int): Количество вершин в графе.
+            - m (int): Количество ребер в графе.
+            - indptr (array): Смещения строк, длина n + 1.
+            - indices (array): Номера ребер по строкам.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если данные в файле некорректны.
+    """
+    indptr = array('q', [0])
+    indices = array('q')
+    with open(filename, "r") as file:
+        n, m = _read_header(file, 2)
+        for _ in range(n):
+            line = file.readline()
+            if not line:
+                raise ValueError("Некорректный формат матрицы инцидентности")
+            row = array('q', map(int, line.split()))
+            if any(not 0 <= e < m for e in row):
+                raise ValueError("Номер ребра вне матрицы")
+            indices.extend(row)
+            indptr.append(len(indices))
+    if len(indices) != 2 * m:
+        raise ValueError("Каждое ребро должно быть инцидентно ровно двум вершинам")
+    return n, m, indptr, indices
+
+
+def iter_adjacency_rows(file, n):
+    """
+    Читает строки матрицы смежности по одной.
+
+    Args:
+        file: Открытый файл, из которого уже прочитана строка с n.
+        n (int): Количество вершин в графе.
+
+    Yields:
+        list: Очередная строка матрицы (список целых чисел).
+
+    Raises:
+        ValueError: Если данные в файле некорректны.
+    """
+    for _ in range(n):
+        row = list(map(int, file.readline().split()))
+        if len(row) != n:
+            raise ValueError("Некорректный формат матрицы смежности")
+        yield row
+
+
+def read_edge_list_streaming(input_filename):
+    """
+    Собирает ребра из файла с матрицей смежности, читая его по строкам.
+
+    Результат совпадает с build_edge_list(*read_adjacency_matrix(input_filename)),
+    но в памяти одновременно находятся одна строка матрицы и массивы ребер.
+
+    Args:
+        input_filename (str): Имя файла с матрицей смежности.
+
+    Returns:
+        tuple: Кортеж из трех элементов:
+            - n (int): Количество вершин в графе.
+            - edge_u (array): Меньшие концы ребер.
+            - edge_v (array): Большие концы ребер.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если данные в файле некорректны.
+    """
+    edge_u = array('q')
+    edge_v = array('q')
+    with open(input_filename, "r") as file:
+        n = int(file.readline())
+        for i, row in enumerate(iter_adjacency_rows(file, n)):
+            degree = len(edge_v)
+            edge_v.extend(compress(range(i + 1, n), row[i + 1:]))
+            edge_u.extend(repeat(i, len(edge_v) - degree))
+    return n, edge_u, edge_v
+
+
+def spill_upper_edges(input_filename, spill):
+    """
+    Первый проход потокового преобразования: выписывает ребра в файл.
+
+    Матрица смежности читается по строкам; для строки i в spill
+    дописываются (как int64) большие концы j ребер (i, j), i < j, в порядке
+    номеров ребер. Меньший конец ребра в файл не пишется: он определяется
+    по row_offsets.
+
+    Args:
+        input_filename (str): Имя файла с матрицей смежности.
+        spill: Файл, открытый для записи в двоичном режиме.
+
+    Returns:
+        tuple: Кортеж из трех элементов:
+            - n (int): Количество вершин в графе.
+            - row_offsets (array): Номер первого ребра каждой строки, длина n + 1
+              (row_offsets[n] - количество ребер m).
+            - lower_degrees (array): Количество ребер (u, v), u < v, у каждой вершины v.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если данные в файле некорректны.
+    """
+    with open(input_filename, "r") as file:
+        n = int(file.readline())
+        row_offsets = array('q', bytes(8 * (n + 1)))
+        lower_degrees = array('q', bytes(8 * n))
+        for i, row in enumerate(iter_adjacency_rows(file, n)):
+            neighbours = array('q', compress(range(i + 1, n), row[i + 1:]))
+            neighbours.tofile(spill)
+            for v in neighbours:
+                lower_degrees[v] += 1
+            row_offsets[i + 1] = row_offsets[i] + len(neighbours)
+    return n, row_offsets, lower_degrees
+
+
+def _read_lower_edges(spill, n, row_offsets, lower_degrees, chunk_size=1 << 20):
+    """
+    Второй проход: по файлу ребер строит для каждой вершины v список ребер
+    (u, v), u < v, в формате CSR.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - lower_indptr (array): Смещения списков, длина n + 1.
+            - lower_indices (array): Номера ребер по вершинам, по возрастанию.
+    """
+    m = row_offsets[n]
+    lower_indptr = array('q', bytes(8 * (n + 1)))
+    for v in range(n):
+        lower_indptr[v + 1] = lower_indptr[v] + lower_degrees[v]
+    fill = array('q', lower_indptr[:n])
+    lower_indices = array('q', bytes(8 * m))
+
+    edge = 0
+    while edge < m:
+        chunk = array('q')
+        chunk.fromfile(spill, min(chunk_size, m - edge))
+        for v in chunk:
+            lower_indices[fill[v]] = edge
+            fill[v] += 1
+            edge += 1
+    return lower_indptr, lower_indices
+
+
+def write_incidence_matrix_streaming(input_filename, output_filename, spill_filename=None):
+    """
+    Преобразует матрицу смежности в полную матрицу инцидентности потоково.
+
+    Первый проход читает матрицу смежности по строкам и выписывает ребра
+    во временный файл, узнавая m. Второй проход строит по нему списки
+    ребер вершин и записывает каждую строку матрицы инцидентности сразу
+    в выходной файл. Вывод побайтно совпадает с write_incidence_matrix.
+
+    Args:
+        input_filename (str): Имя файла с матрицей смежности.
+        output_filename (str): Имя файла для записи.
+        spill_filename (str): Имя временного файла ребер (по умолчанию
+            создается и удаляется автоматически).
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - n (int): Количество вершин в графе.
+            - m (int): Количество ребер в графе.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если данные в файле некорректны.
+
+    Note:
+        В памяти одновременно находятся одна строка матрицы смежности,
+        шаблон строки вывода (см. write_incidence_rows) и O(n + m) целых чисел в array('q'), а не
+        n * n и n * m объектов Python.
+    """
+    if spill_filename is None:
+        descriptor, spill_filename = tempfile.mkstemp(suffix=".edges")
+        os.close(descriptor)
+        remove_spill = True
+    else:
+        remove_spill = False
+
+    try:
+        with open(spill_filename, "wb") as spill:
+            n, row_offsets, lower_degrees = spill_upper_edges(input_filename, spill)
+        with open(spill_filename, "rb") as spill:
+            lower_indptr, lower_indices = _read_lower_edges(spill, n, row_offsets, lower_degrees)
+    finally:
+        if remove_spill:
+            os.remove(spill_filename)
+
+    m = row_offsets[n]
+    with open(output_filename, "wb") as f:
+        f.write(f"{n} {m}\n".encode())
+        # Ребра (u, w), u < w, имеют меньшие номера, чем ребра строки w
+        write_incidence_rows(f, m, (lower_indices[lower_indptr[w]:lower_indptr[w + 1]]
+                                    + array('q', range(row_offsets[w], row_offsets[w + 1]))
+                                    for w in range(n)))
+    return n, m
+
+
+def convert_adjacency_to_incidence(input_filename, output_filename, fmt="dense"):
+    """
+    Преобразует файл с матрицей смежности в файл с матрицей инцидентности.
+
+    Args:
+        input_filename (str): Имя файла с матрицей смежности.
+        output_filename (str): Имя файла для записи.
+        fmt (str): Формат вывода: "dense" - полная матрица, "edges" - список
+            ребер, "coo" - координатный формат, "csr" - ребра каждой вершины.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - n (int): Количество вершин в графе.
+            - m (int): Количество ребер в графе.
+
+    Raises:
+        ValueError: Если данные некорректны или формат неизвестен.
+
+    Note:
+        Для разреженных форматов матрица смежности читается по строкам
+        (см. read_edge_list_streaming), поэтому память - O(n + m);
+        полная матрица строится в памяти целиком (n * n и n * m элементов).
+        Файл в двоичном формате (см. write_binary_adjacency) распознается
+        по сигнатуре и обрабатывается через mmap.
+    """
+    if fmt not in INCIDENCE_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    if is_binary_adjacency(input_filename):
+        return convert_binary_adjacency_to_incidence(input_filename, output_filename, fmt)
+    if fmt == "dense":
+        n, adjacency = read_adjacency_matrix(input_filename)
+        m, incidence = build_incidence_matrix(n, adjacency)
+        write_incidence_matrix(output_filename, n, m, incidence)
+        return n, m
+
+    n, edge_u, edge_v = read_edge_list_streaming(input_filename)
+    return n, write_incidence_from_edges(output_filename, n, edge_u, edge_v, fmt)
+
+
+def write_incidence_from_edges(filename, n, edge_u, edge_v, fmt="dense"):
+    """
+    Записывает матрицу инцидентности, заданную списком ребер, в нужном формате.
+
+    Args:
+        filename (str): Имя файла для записи.
+        n (int): Количество вершин в графе.
+        edge_u (array): Меньшие концы ребер.
+        edge_v (array): Большие концы ребер.
+        fmt (str): Формат вывода (см. convert_adjacency_to_incidence).
+
+    Returns:
+        int: Количество ребер в графе.
+
+    Note:
+        Полная матрица записывается по спискам ребер вершин (CSR)
+        через write_incidence_rows, без матрицы n x m в памяти.
+    """
+    m = len(edge_u)
+    if fmt == "edges":
+        write_edge_list(filename, n, edge_u, edge_v)
+    elif fmt == "coo":
+        rows, cols = build_incidence_coo(n, edge_u, edge_v)
+        write_incidence_coo(filename, n, m, rows, cols)
+    elif fmt == "csr":
+        indptr, indices = build_incidence_csr(n, edge_u, edge_v)
+        write_incidence_csr(filename, n, m, indptr, indices)
+    else:
+        indptr, indices = build_incidence_csr(n, edge_u, edge_v)
+        with open(filename, "wb") as f:
+            f.write(f"{n} {m}\n".encode())
+            write_incidence_rows(f, m, (indices[indptr[u]:indptr[u + 1]] for u in range(n)))
+    return m
+
+
+def _binary_row_offsets(n):
+    """
+    Возвращает смещения строк двоичной матрицы смежности от конца заголовка.
+
+    Строка i хранит биты столбцов i + 1 .. n - 1 и занимает целое
+    число байтов; столбец j - бит (j - i - 1) % 8 байта (j - i - 1) // 8
+    (младший бит первым).
+
+    Returns:
+        array: Смещения, длина n + 1 (последнее - размер данных).
+    """
+    offsets = array('q', bytes(8 * (n + 1)))
+    for i in range(n):
+        offsets[i + 1] = offsets[i] + (n - i + 6) // 8
+    return offsets
+
+
+def write_binary_adjacency(filename, n, rows):
+    """
+    Записывает матрицу смежности в двоичном формате с упаковкой по битам.
+
+    Хранится только верхний треугольник: один бит на пару вершин i < j,
+    около n * n / 16 байт вместо n * n чисел.
+
+    Args:
+        filename (str): Имя файла для записи.
+        n (int): Количество вершин в графе.
+        rows: Строки матрицы смежности (списки целых чисел) по порядку.
+
+    Raises:
+        IOError: Если возникла ошибка при записи в файл.
+    """
+    with open(filename, "wb") as f:
+        f.write(_BINARY_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION, n))
+        for i, row in enumerate(rows):
+            # Биты строки, начиная со старшего: столбец n - 1 ... столбец i + 1
+            bits = "".join(["0" if x == 0 else "1" for x in row[:i:-1]])
+            f.write(int(bits or "0", 2).to_bytes((n - i + 6) // 8, "little"))
+
+
+def convert_adjacency_text_to_binary(input_filename, output_filename):
+    """
+    Преобразует текстовую матрицу смежности в двоичный формат.
+
+    Матрица читается по строкам, поэтому размер графа не ограничен памятью.
+
+    Args:
+        input_filename (str): Имя файла с матрицей смежности.
+        output_filename (str): Имя двоичного файла для записи.
+
+    Returns:
+        int: Количество вершин в графе.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если данные в файле некорректны.
+    """
+    with open(input_filename, "r") as file:
+        n = int(file.readline())
+        write_binary_adjacency(output_filename, n, iter_adjacency_rows(file, n))
+    return n
+
+
+class BinaryAdjacency:
+    """
+    Матрица смежности в двоичном формате, отображенная в память через mmap.
+
+    Файл не разбирается в объекты Python: в памяти находятся только
+    смещения строк (n + 1 чисел). После работы матрицу нужно закрыть
+    методом close().
+    """
+    def __init__(self, n, data, row_offsets, header_size=0):
+        """
+        Args:
+            n (int): Количество вершин в графе.
+            data: Содержимое файла (mmap или bytes).
+            row_offsets (array): Смещения строк (см. _binary_row_offsets).
+            header_size (int): Смещение первой строки в data.
+        """
+        self.n = n
+        self.data = data
+        self.row_offsets = row_offsets
+        self.header_size = header_size
+        self._mmap = None
+
+    def close(self):
+        """
+        Освобождает отображение файла.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def has_edge(self, u, v):
+        """
+        Проверяет, есть ли ребро между вершинами u и v.
+        """
+        if u == v:
+            return False
+        if u > v:
+            u, v = v, u
+        k = v - u - 1
+        return bool(self.data[self.header_size + self.row_offsets[u] + k // 8] >> k % 8 & 1)
+
+    def nbytes(self):
+        """
+        Returns:
+            int: Размер упакованных строк в байтах.
+        """
+        return self.row_offsets[self.n]
+
+
+def load_binary_adjacency(filename):
+    """
+    Открывает двоичную матрицу смежности через mmap.
+
+    Args:
+        filename (str): Имя файла, записанного write_binary_adjacency.
+
+    Returns:
+        BinaryAdjacency: Матрица поверх отображенного файла.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если файл имеет неверный формат.
+    """
+    with open(filename, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _BINARY_HEADER.size:
+            raise ValueError("Файл слишком короткий для матрицы смежности")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic, version, n = _BINARY_HEADER.unpack_from(mm)
+        if magic != _BINARY_MAGIC or version != _BINARY_VERSION:
+            raise ValueError("Неизвестный формат двоичной матрицы смежности")
+        row_offsets = _binary_row_offsets(n)
+        if size != _BINARY_HEADER.size + row_offsets[n]:
+            raise ValueError("Размер файла не совпадает с количеством вершин")
+    except ValueError:
+        mm.close()
+        raise
+    adjacency = BinaryAdjacency(n, mm, row_offsets, _BINARY_HEADER.size)
+    adjacency._mmap = mm
+    return adjacency
+
+
+def is_binary_adjacency(filename):
+    """
+    Проверяет по сигнатуре, записан ли файл в двоичном формате матрицы смежности.
+    """
+    with open(filename, "rb") as f:
+        return f.read(len(_BINARY_MAGIC)) == _BINARY_MAGIC
+
+
+def build_edge_list_binary(adjacency):
+    """
+    Собирает ребра из двоичной матрицы смежности.
+
+    Отрезки ненулевых байтов находит регулярное выражение прямо
+    в отображенном файле, а номера установленных битов каждого байта
+    берутся из таблицы, поэтому нулевые байты (отсутствующие ребра)
+    пропускаются со скоростью сканирования памяти.
+
+    Args:
+        adjacency (BinaryAdjacency): Двоичная матрица смежности.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - edge_u (array): Меньшие концы ребер.
+            - edge_v (array): Большие концы ребер.
+
+    Raises:
+        ValueError: Если установлен бит за пределами строки.
+
+    Note:
+        Строки и байты просматриваются по возрастанию, поэтому порядок
+        ребер совпадает с build_edge_list.
+    """
+    n, offsets, base = adjacency.n, adjacency.row_offsets, adjacency.header_size
+    edge_u = array('q')
+    edge_v = array('q')
+    row = 0
+    for match in _NONZERO_BYTES.finditer(adjacency.data, base, base + offsets[n]):
+        for position, byte in enumerate(match.group(), match.start() - base):
+            while offsets[row + 1] <= position:
+                row += 1
+            first = row + 1 + 8 * (position - offsets[row])
+            bits = _BYTE_BITS[byte]
+            if first + bits[-1] >= n:
+                raise ValueError("Установлен бит за пределами строки матрицы смежности")
+            for bit in bits:
+                edge_u.append(row)
+                edge_v.append(first + bit)
+    return edge_u, edge_v
+
+
+def convert_binary_adjacency_to_incidence(input_filename, output_filename, fmt="dense"):
+    """
+    Преобразует двоичную матрицу смежности в файл с матрицей инцидентности.
+
+    Args:
+        input_filename (str): Имя двоичного файла с матрицей смежности.
+        output_filename (str): Имя файла для записи.
+        fmt (str): Формат вывода (см. convert_adjacency_to_incidence).
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - n (int): Количество вершин в графе.
+            - m (int): Количество ребер в графе.
+
+    Raises:
+        ValueError: Если данные некорректны или формат неизвестен.
+    """
+    if fmt not in INCIDENCE_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    adjacency = load_binary_adjacency(input_filename)
+    try:
+        edge_u, edge_v = build_edge_list_binary(adjacency)
+    finally:
+        adjacency.close()
+    return adjacency.n, write_incidence_from_edges(output_filename, adjacency.n, edge_u, edge_v, fmt)
 
 
 def main():
@@ -88,9 +904,7 @@ def main():
     output_filename = "output.txt"
 
     try:
-        n, adjacency = read_adjacency_matrix(input_filename)
-        m, incidence = build_incidence_matrix(n, adjacency)
-        write_incidence_matrix(output_filename, n, m, incidence)
+        n, m = convert_adjacency_to_incidence(input_filename, output_filename)
         print(f"Матрица инцидентности успешно записана в файл '{output_filename}'")
         print(f"Граф содержит {n} вершин и {m} рёбер")
     except FileNotFoundError:
@@ -0,0 +1,359 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from Graf2 import (INCIDENCE_FORMATS, build_edge_list, build_edge_list_binary, build_incidence_csr,
+                   build_incidence_matrix, convert_adjacency_text_to_binary,
+                   convert_adjacency_to_incidence, load_binary_adjacency, read_adjacency_matrix,
+                   write_incidence_matrix, write_incidence_rows)
+from Graf2_numpy import (build_edge_arrays, build_incidence_matrix_numpy, build_incidence_matrix_parallel,
+                         convert_adjacency_to_incidence_numpy, read_adjacency_array,
+                         write_incidence_matrix_numpy)
+
+# Наибольшее n * m, при котором строится полная матрица инцидентности из списков Python
+DENSE_CELL_LIMIT = 5 * 10 ** 7
+
+
+def generate_adjacency(n, average_degree=8, seed=0):
+    """
+    Генерирует случайный неориентированный граф без петель.
+
+    Args:
+        n (int): Количество вершин в графе.
+        average_degree (float): Средняя степень вершины.
+        seed (int): Зерно генератора случайных чисел.
+
+    Returns:
+        numpy.ndarray: Симметричная матрица смежности n x n типа uint8
+            с нулевой диагональю.
+    """
+    rng = np.random.default_rng(seed)
+    density = min(1.0, average_degree / max(n - 1, 1))
+    upper = np.triu(rng.random((n, n)) < density, k=1)
+    return (upper | upper.T).astype(np.uint8)
+
+
+def write_adjacency_matrix(filename, adjacency):
+    """
+    Записывает матрицу смежности в текстовом формате Graf2.
+
+    Args:
+        filename (str): Имя файла для записи.
+        adjacency (numpy.ndarray): Матрица смежности n x n.
+    """
+    n = adjacency.shape[0]
+    line = np.full(max(2 * n, 1), ord(" "), dtype=np.uint8)
+    line[-1] = ord("\n")
+    with open(filename, "wb") as f:
+        f.write(f"{n}\n".encode())
+        for row in adjacency:
+            np.add(row, ord("0"), out=line[0:2 * n:2], casting="unsafe")
+            f.write(line.tobytes())
+
+
+def time_call(func, *args):
+    """
+    Возвращает результат вызова и время его выполнения в секундах.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _read_bytes(filename):
+    with open(filename, "rb") as f:
+        return f.read()
+
+
+def check_numpy_equivalence(sizes=(1, 2, 3, 10, 50, 200), average_degree=4, seed=0):
+    """
+    Сравнивает вывод Graf2 и Graf2_numpy во всех форматах.
+
+    Args:
+        sizes (tuple): Количества вершин в проверяемых графах.
+        average_degree (float): Средняя степень вершины.
+        seed (int): Зерно генератора случайных чисел.
+
+    Returns:
+        list: Пары (n, формат), для которых файлы различаются.
+    """
+    mismatches = []
+    with tempfile.TemporaryDirectory() as directory:
+        input_filename = os.path.join(directory, "input.txt")
+        expected_filename = os.path.join(directory, "expected.txt")
+        actual_filename = os.path.join(directory, "actual.txt")
+        for n in sizes:
+            write_adjacency_matrix(input_filename, generate_adjacency(n, average_degree, seed))
+            for fmt in INCIDENCE_FORMATS:
+                convert_adjacency_to_incidence(input_filename, expected_filename, fmt)
+                convert_adjacency_to_incidence_numpy(input_filename, actual_filename, fmt)
+                if _read_bytes(expected_filename) != _read_bytes(actual_filename):
+                    mismatches.append((n, fmt))
+    return mismatches
+
+
+def bench_numpy(sizes=(1000, 2000, 5000, 10000), average_degree=8, seed=0):
+    """
+    Сравнивает построение матрицы инцидентности на Python и на NumPy.
+
+    Матрица смежности уже загружена в память (как список списков
+    для Graf2 и как массив для Graf2_numpy), чтение файла не замеряется.
+    Полная матрица из списков Python строится, только если n * m не
+    больше DENSE_CELL_LIMIT, иначе ее время - None.
+
+    Returns:
+        list: Для каждого размера - словарь с n, m и временем в секундах
+    """
+    rows = []
+    for n in sizes:
+        adjacency = generate_adjacency(n, average_degree, seed)
+        adjacency_lists = adjacency.tolist()
+        (edge_u, _), python_edges = time_call(build_edge_list, n, adjacency_lists)
+        m = len(edge_u)
+        _, numpy_edges = time_call(build_edge_arrays, adjacency)
+        python_dense = None
+        if n * m <= DENSE_CELL_LIMIT:
+            _, python_dense = time_call(build_incidence_matrix, n, adjacency_lists)
+        _, numpy_dense = time_call(build_incidence_matrix_numpy, adjacency)
+        del adjacency_lists
+        rows.append({"n": n, "m": m, "python_edges": python_edges, "numpy_edges": numpy_edges,
+                     "python_dense": python_dense, "numpy_dense": numpy_dense})
+    return rows
+
+
+def _write_incidence_matrix_join(filename, n, m, incidence):
+    """
+    Прежняя запись матрицы инцидентности через " ".join - для сравнения.
+    """
+    with open(filename, "w") as f:
+        f.write(f"{n} {m}\n")
+        for row in incidence:
+            f.write(" ".join(map(str, row)) + "\n")
+
+
+def _write_incidence_csr_rows(filename, n, m, indptr, indices):
+    """
+    Записывает полную матрицу инцидентности по спискам ребер вершин.
+    """
+    with open(filename, "wb") as f:
+        f.write(f"{n} {m}\n".encode())
+        write_incidence_rows(f, m, (indices[indptr[u]:indptr[u + 1]] for u in range(n)))
+
+
+def bench_writers(n=2000, average_degree=8, seed=0):
+    """
+    Сравнивает скорость записи полной матрицы инцидентности.
+
+    Returns:
+        dict: Размер вывода в МБ, скорость каждого способа записи в МБ/с
+            и совпадают ли выведенные файлы
+    """
+    adjacency = generate_adjacency(n, average_degree, seed)
+    adjacency_lists = adjacency.tolist()
+    m, incidence = build_incidence_matrix(n, adjacency_lists)
+    edge_u, edge_v = build_edge_list(n, adjacency_lists)
+    del adjacency_lists
+    indptr, indices = build_incidence_csr(n, edge_u, edge_v)
+    _, incidence_numpy = build_incidence_matrix_numpy(adjacency)
+
+    writers = {
+        "join": (_write_incidence_matrix_join, (n, m, incidence)),
+        "bytearray": (write_incidence_matrix, (n, m, incidence)),
+        "bytearray_csr": (_write_incidence_csr_rows, (n, m, indptr, indices)),
+        "numpy": (write_incidence_matrix_numpy, (n, m, incidence_numpy)),
+    }
+    result = {}
+    contents = set()
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "output.txt")
+        for name, (writer, args) in writers.items():
+            _, seconds = time_call(writer, filename, *args)
+            megabytes = os.path.getsize(filename) / 2 ** 20
+            result[name] = megabytes / seconds
+            contents.add(_read_bytes(filename))
+    result["megabytes"] = megabytes
+    result["identical"] = len(contents) == 1
+    return result
+
+
+def bench_parallel(n=5000, worker_counts=None, average_degree=8, seed=0):
+    """
+    Замеряет параллельное построение полной матрицы инцидентности.
+
+    Args:
+        n (int): Количество вершин в графе.
+        worker_counts (tuple): Количества процессов (по умолчанию 1, 2, 4 ... до числа ядер).
+
+    Returns:
+        list: Для каждого количества процессов - словарь со временем,
+            ускорением относительно одного процесса и совпадением результата
+    """
+    if worker_counts is None:
+        cpu_count = os.cpu_count() or 1
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cpu_count:
+            worker_counts.append(worker_counts[-1] * 2)
+    adjacency = generate_adjacency(n, average_degree, seed)
+    (_, expected), sequential = time_call(build_incidence_matrix_numpy, adjacency)
+    rows = []
+    for workers in worker_counts:
+        (_, incidence), seconds = time_call(build_incidence_matrix_parallel, adjacency, workers, 0)
+        try:
+            identical = bool(np.array_equal(expected, incidence.array))
+        finally:
+            incidence.close()
+        rows.append({"workers": workers, "seconds": seconds, "speedup": sequential / seconds,
+                     "identical": identical})
+    return rows
+
+
+def bench_parser(n=5000, average_degree=8, seed=0):
+    """
+    Сравнивает чтение текстовой матрицы смежности: read_adjacency_matrix
+    (по строкам, int для каждого элемента) и read_adjacency_array
+    (весь файл, NumPy, с проверкой симметричности и диагонали).
+
+    Returns:
+        dict: n, время обоих способов в секундах, ускорение и совпадение матриц
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "input.txt")
+        write_adjacency_matrix(filename, generate_adjacency(n, average_degree, seed))
+        (_, expected), lines_seconds = time_call(read_adjacency_matrix, filename)
+        (_, adjacency), numpy_seconds = time_call(read_adjacency_array, filename)
+    return {"n": n, "lines": lines_seconds, "numpy": numpy_seconds,
+            "speedup": lines_seconds / numpy_seconds,
+            "identical": bool(np.array_equal(np.array(expected, dtype=np.uint8), adjacency))}
+
+
+def _traced_call(func, *args):
+    """
+    Возвращает результат вызова, время в секундах (без трассировки)
+    и пиковую память в байтах (во втором, трассируемом вызове).
+    """
+    result, seconds = time_call(func, *args)
+    del result
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def _load_edges_binary(filename):
+    adjacency = load_binary_adjacency(filename)
+    try:
+        return build_edge_list_binary(adjacency)
+    finally:
+        adjacency.close()
+
+
+def bench_binary(n=3000, average_degree=8, seed=0):
+    """
+    Сравнивает текстовый и двоичный форматы матрицы смежности.
+
+    Для текста замеряется read_adjacency_matrix с build_edge_list,
+    для двоичного формата - load_binary_adjacency с build_edge_list_binary.
+
+    Returns:
+        dict: Размеры файлов в байтах, время в секундах и пиковая память
+            в байтах для каждого формата, совпадают ли ребра
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        text_filename = os.path.join(directory, "input.txt")
+        binary_filename = os.path.join(directory, "input.bin")
+        write_adjacency_matrix(text_filename, generate_adjacency(n, average_degree, seed))
+        convert_adjacency_text_to_binary(text_filename, binary_filename)
+
+        (_, adjacency), text_read, text_memory = _traced_call(read_adjacency_matrix, text_filename)
+        text_edges, text_extract = time_call(build_edge_list, n, adjacency)
+        del adjacency
+        binary_edges, binary_seconds, binary_memory = _traced_call(_load_edges_binary, binary_filename)
+        return {
+            "n": n,
+            "m": len(text_edges[0]),
+            "text_size": os.path.getsize(text_filename),
+            "binary_size": os.path.getsize(binary_filename),
+            "text_seconds": text_read + text_extract,
+            "binary_seconds": binary_seconds,
+            "text_memory": text_memory,
+            "binary_memory": binary_memory,
+            "identical": text_edges == binary_edges,
+        }
+
+
+def main():
+    """
+    Точка входа: проверяет совпадение вывода и печатает таблицу замеров.
+
+    Returns:
+        int: Код завершения: 0, если все результаты совпали, иначе 1.
+    """
+    parser = argparse.ArgumentParser(description="Бенчмарк преобразований Graf2")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000],
+                        help="количества вершин")
+    parser.add_argument("--degree", type=float, default=8, help="средняя степень вершины")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mismatches = check_numpy_equivalence(seed=args.seed)
+    identical = not mismatches
+    if mismatches:
+        print(f"Вывод Graf2_numpy отличается от Graf2: {mismatches}")
+    else:
+        print("Вывод Graf2_numpy совпадает с Graf2 во всех форматах")
+
+    print(f"\n{'n':>7} {'m':>9} {'ребра Python':>13} {'ребра NumPy':>12} {'ускорение':>10} "
+          f"{'матрица Python':>15} {'матрица NumPy':>14} {'ускорение':>10}")
+    for row in bench_numpy(args.sizes, args.degree, args.seed):
+        edges_speedup = row["python_edges"] / row["numpy_edges"]
+        if row["python_dense"] is None:
+            python_dense, dense_speedup = f"{'-':>15}", f"{'-':>10}"
+        else:
+            python_dense = f"{row['python_dense']:>15.3f}"
+            dense_speedup = f"{row['python_dense'] / row['numpy_dense']:>10.1f}"
+        print(f"{row['n']:>7} {row['m']:>9} {row['python_edges']:>13.3f} "
+              f"{row['numpy_edges']:>12.4f} {edges_speedup:>10.1f} "
+              f"{python_dense} {row['numpy_dense']:>14.4f} {dense_speedup}")
+
+    writers = bench_writers(seed=args.seed)
+    print(f"\nЗапись {writers['megabytes']:.1f} МБ полной матрицы инцидентности, МБ/с:")
+    for name in ("join", "bytearray", "bytearray_csr", "numpy"):
+        print(f"{name:>14} {writers[name]:>10.1f}")
+    if not writers["identical"]:
+        print("Выведенные файлы различаются")
+        identical = False
+
+    print(f"\n{'процессов':>10} {'время':>8} {'ускорение':>10}")
+    for row in bench_parallel(seed=args.seed):
+        identical = identical and row["identical"]
+        print(f"{row['workers']:>10} {row['seconds']:>8.3f} {row['speedup']:>10.2f}"
+              f"{'' if row['identical'] else '  результат отличается'}")
+
+    parser_row = bench_parser(seed=args.seed)
+    identical = identical and parser_row["identical"]
+    print(f"\nЧтение матрицы смежности n = {parser_row['n']}: по строкам {parser_row['lines']:.2f} с, "
+          f"NumPy {parser_row['numpy']:.3f} с, ускорение {parser_row['speedup']:.1f}"
+          f"{'' if parser_row['identical'] else ', матрицы различаются'}")
+
+    binary = bench_binary(seed=args.seed)
+    print(f"\nМатрица смежности n = {binary['n']}, m = {binary['m']}:")
+    print(f"{'формат':>8} {'файл, МБ':>9} {'время, с':>9} {'память, МБ':>11}")
+    for name in ("text", "binary"):
+        print(f"{name:>8} {binary[name + '_size'] / 2 ** 20:>9.2f} {binary[name + '_seconds']:>9.3f} "
+              f"{binary[name + '_memory'] / 2 ** 20:>11.2f}")
+    if not binary["identical"]:
+        print("Ребра двоичного формата отличаются от текстового")
+        identical = False
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,685 @@
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+
+from Graf2 import (INCIDENCE_FORMATS, build_edge_list_binary, build_incidence_coo, build_incidence_csr,
+                   is_binary_adjacency, load_binary_adjacency, spill_upper_edges, write_edge_list,
+                   write_incidence_coo, write_incidence_csr, write_incidence_rows)
+
+# Файл индекса: заголовок (сигнатура, версия, флаги, n, m, исходный файл:
+# SHA-1 абсолютного пути, размер, st_mtime_ns), затем массивы int64
+# row_offsets, edge_u, edge_v, indptr, indices
+_INDEX_MAGIC = b"G2IX"
+_INDEX_VERSION = 3
+_INDEX_HEADER = struct.Struct("<4sIQQQ20s4xQQ")
+
+# Флаги индекса: ребра пронумерованы в каноническом порядке;
+# индекс построен по исходному файлу (а не получен изменением ребер)
+_INDEX_CANONICAL = 1
+_INDEX_SOURCE = 2
+
+# Расширения файлов индекса, сохраняемых рядом с выходным файлом:
+# построенного по матрице смежности и полученного изменением ребер
+INDEX_SUFFIX = ".idx"
+DELTA_INDEX_SUFFIX = ".delta.idx"
+
+
+class GraphIndex:
+    """
+    Индекс ребер неориентированного графа для быстрых запросов.
+
+    Номер ребра (u, v), u < v, - номер столбца матрицы инцидентности
+    (обход верхнего треугольника по строкам). Хранятся:
+        - row_offsets: номер первого ребра каждой строки, длина n + 1;
+          ребра строки u - row_offsets[u] .. row_offsets[u + 1] - 1,
+          их большие концы в edge_v возрастают;
+        - edge_u, edge_v: концы каждого ребра;
+        - indptr, indices: ребра каждой вершины (CSR), по возрастанию.
+    Все массивы - array('q') или, у загруженного индекса, memoryview
+    поверх отображенного файла. Загруженный индекс нужно закрыть
+    методом close().
+
+    После изменений в режиме только добавления (см. apply_edge_delta)
+    нумерация ребер перестает быть канонической: canonical = False,
+    ребра строки в edge_v уже не упорядочены, и edge_id перебирает
+    ребра вершины за O(степени).
+
+    source - отпечаток файла с матрицей смежности, по которому построен
+    индекс (см. source_identity), или None у индекса после изменения ребер.
+    """
+    def __init__(self, n, row_offsets, edge_u, edge_v, indptr, indices, canonical=True,
+                 source=None):
+        self.n = n
+        self.row_offsets = row_offsets
+        self.edge_u = edge_u
+        self.edge_v = edge_v
+        self.indptr = indptr
+        self.indices = indices
+        self.canonical = canonical
+        self.source = source
+        self._mmap = None
+
+    @classmethod
+    def from_edges(cls, n, edge_u, edge_v):
+        """
+        Строит индекс по списку ребер в каноническом порядке.
+
+        Args:
+            n (int): Количество вершин в графе.
+            edge_u (array): Меньшие концы ребер.
+            edge_v (array): Большие концы ребер.
+
+        Returns:
+            GraphIndex: Новый индекс.
+        """
+        indptr, indices = build_incidence_csr(n, edge_u, edge_v)
+        return cls(n, _row_offsets(n, edge_u), edge_u, edge_v, indptr, indices)
+
+    @property
+    def m(self):
+        """Количество ребер в графе."""
+        return len(self.edge_u)
+
+    def close(self):
+        """
+        Освобождает отображение файла индекса.
+        """
+        if self._mmap is not None:
+            for name in ("row_offsets", "edge_u", "edge_v", "indptr", "indices"):
+                view = getattr(self, name)
+                if isinstance(view, memoryview):
+                    view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def edge_id(self, u, v):
+        """
+        Возвращает номер ребра (u, v) за O(log степени u).
+
+        Returns:
+            int: Номер ребра или None, если ребра нет.
+        """
+        if u > v:
+            u, v = v, u
+        if u == v or u < 0 or v >= self.n:
+            return None
+        if not self.canonical:
+            for edge in self.incident_edges(u):
+                if self.edge_v[edge] == v and self.edge_u[edge] == u:
+                    return edge
+            return None
+        start, stop = self.row_offsets[u], self.row_offsets[u + 1]
+        position = bisect_left(self.edge_v, v, start, stop)
+        if position < stop and self.edge_v[position] == v:
+            return position
+        return None
+
+    def endpoints(self, edge):
+        """
+        Возвращает концы ребра (u, v), u < v, за O(1).
+        """
+        return self.edge_u[edge], self.edge_v[edge]
+
+    def degree(self, u):
+        """
+        Возвращает степень вершины за O(1).
+        """
+        return self.indptr[u + 1] - self.indptr[u]
+
+    def incident_edges(self, u):
+        """
+        Возвращает номера ребер, инцидентных вершине, по возрастанию.
+        """
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    def neighbours(self, u):
+        """
+        Возвращает соседей вершины в порядке номеров ребер.
+        """
+        edge_u, edge_v = self.edge_u, self.edge_v
+        return [edge_v[e] if edge_u[e] == u else edge_u[e] for e in self.incident_edges(u)]
+
+    def save(self, filename):
+        """
+        Сохраняет индекс в двоичный файл.
+
+        Args:
+            filename (str): Имя файла для записи.
+
+        Raises:
+            IOError: Если возникла ошибка при записи в файл.
+        """
+        flags = _INDEX_CANONICAL if self.canonical else 0
+        path_digest, size, mtime_ns = bytes(20), 0, 0
+        if self.source is not None:
+            flags |= _INDEX_SOURCE
+            path_digest, size, mtime_ns = self.source
+        with open(filename, "wb") as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, flags, self.n, self.m,
+                                       path_digest, size, mtime_ns))
+            for values in (self.row_offsets, self.edge_u, self.edge_v, self.indptr, self.indices):
+                f.write(values if isinstance(values, memoryview) else array('q', values).tobytes())
+
+
+def load_graph_index(filename):
+    """
+    Загружает индекс через mmap без разбора в объекты Python.
+
+    Args:
+        filename (str): Имя файла, записанного GraphIndex.save.
+
+    Returns:
+        GraphIndex: Индекс поверх отображенного файла.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если файл имеет неверный формат.
+    """
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _INDEX_HEADER.size:
+            raise ValueError("Файл слишком короткий для индекса графа")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic, version, flags, n, m, path_digest, size, mtime_ns = _INDEX_HEADER.unpack_from(mm)
+        if magic != _INDEX_MAGIC or version != _INDEX_VERSION:
+            raise ValueError("Неизвестный формат индекса графа")
+        if len(mm) != _INDEX_HEADER.size + 8 * (2 * (n + 1) + 4 * m):
+            raise ValueError("Размер файла не совпадает с размером графа")
+        if sys.byteorder != "little":
+            raise ValueError("Отображение файла поддерживается только на little-endian платформах")
+    except ValueError:
+        mm.close()
+        raise
+    values = memoryview(mm)[_INDEX_HEADER.size:].cast('q')
+    arrays = []
+    start = 0
+    for length in (n + 1, m, m, n + 1, 2 * m):
+        arrays.append(values[start:start + length])
+        start += length
+    values.release()
+    source = (path_digest, size, mtime_ns) if flags & _INDEX_SOURCE else None
+    index = GraphIndex(n, *arrays, canonical=bool(flags & _INDEX_CANONICAL), source=source)
+    index._mmap = mm
+    return index
+
+
+def source_identity(input_filename):
+    """
+    Возвращает отпечаток файла с матрицей смежности для проверки кеша.
+
+    Returns:
+        tuple: SHA-1 абсолютного пути (20 байт), размер и st_mtime_ns.
+    """
+    path = os.path.abspath(input_filename)
+    stat = os.stat(path)
+    return hashlib.sha1(os.fsencode(path)).digest(), stat.st_size, stat.st_mtime_ns
+
+
+def build_graph_index(input_filename):
+    """
+    Строит индекс по файлу с матрицей смежности (текстовому или двоичному).
+
+    Текстовая матрица читается потоково (см. Graf2.spill_upper_edges),
+    поэтому память - O(n + m) целых чисел.
+
+    Args:
+        input_filename (str): Имя файла с матрицей смежности.
+
+    Returns:
+        GraphIndex: Новый индекс с отпечатком входного файла в source.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если данные в файле некорректны.
+    """
+    # Отпечаток снимается до чтения: если файл изменится во время
+    # построения, кеш не совпадет с ним при следующей проверке
+    source = source_identity(input_filename)
+    if is_binary_adjacency(input_filename):
+        adjacency = load_binary_adjacency(input_filename)
+        try:
+            edge_u, edge_v = build_edge_list_binary(adjacency)
+        finally:
+            adjacency.close()
+        index = GraphIndex.from_edges(adjacency.n, edge_u, edge_v)
+        index.source = source
+        return index
+
+    with tempfile.TemporaryFile() as spill:
+        n, row_offsets, _ = spill_upper_edges(input_filename, spill)
+        m = row_offsets[n]
+        spill.seek(0)
+        edge_v = array('q')
+        edge_v.fromfile(spill, m)
+    edge_u = array('q', bytes(8 * m))
+    for u in range(n):
+        start, stop = row_offsets[u], row_offsets[u + 1]
+        edge_u[start:stop] = array('q', [u]) * (stop - start)
+    indptr, indices = build_incidence_csr(n, edge_u, edge_v)
+    return GraphIndex(n, row_offsets, edge_u, edge_v, indptr, indices, source=source)
+
+
+def index_filename(output_filename):
+    """
+    Возвращает имя файла индекса, построенного по матрице смежности,
+    рядом с выходным файлом.
+    """
+    return output_filename + INDEX_SUFFIX
+
+
+def delta_index_filename(output_filename):
+    """
+    Возвращает имя файла индекса, полученного изменением ребер
+    (см. apply_delta_to_output), рядом с выходным файлом.
+    """
+    return output_filename + DELTA_INDEX_SUFFIX
+
+
+def load_or_build_index(input_filename, output_filename):
+    """
+    Возвращает индекс из кеша рядом с выходным файлом или строит его.
+
+    Кеш действителен, только если он построен по тому же файлу:
+    совпадают абсолютный путь, размер и st_mtime_ns (см. source_identity).
+    Иначе индекс строится заново и сохраняется. Индекс после изменения
+    ребер хранится отдельно и здесь не используется.
+
+    Args:
+        input_filename (str): Имя файла с матрицей смежности.
+        output_filename (str): Имя выходного файла, рядом с которым хранится индекс.
+
+    Returns:
+        GraphIndex: Индекс графа.
+    """
+    cached = index_filename(output_filename)
+    if os.path.exists(cached):
+        try:
+            index = load_graph_index(cached)
+        except ValueError:
+            index = None
+        if index is not None:
+            if index.source == source_identity(input_filename):
+                return index
+            index.close()
+    index = build_graph_index(input_filename)
+    index.save(cached)
+    return index
+
+
+def write_incidence_from_index(filename, index, fmt="dense"):
+    """
+    Записывает матрицу инцидентности по индексу в нужном формате.
+
+    Args:
+        filename (str): Имя файла для записи.
+        index (GraphIndex): Индекс графа.
+        fmt (str): Формат вывода (см. Graf2.convert_adjacency_to_incidence).
+
+    Raises:
+        ValueError: Если формат неизвестен.
+    """
+    if fmt not in INCIDENCE_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    n, m = index.n, index.m
+    if fmt == "edges":
+        write_edge_list(filename, n, index.edge_u, index.edge_v)
+    elif fmt == "coo":
+        # Загруженный из файла индекс хранит столбцы как memoryview
+        rows, cols = build_incidence_coo(n, _copy(index.edge_u, 0, m), _copy(index.edge_v, 0, m))
+        write_incidence_coo(filename, n, m, rows, cols)
+    elif fmt == "csr":
+        write_incidence_csr(filename, n, m, index.indptr, index.indices)
+    else:
+        with open(filename, "wb") as f:
+            f.write(f"{n} {m}\n".encode())
+            write_incidence_rows(f, m, (index.incident_edges(u) for u in range(n)))
+
+
+def convert_adjacency_to_incidence_indexed(input_filename, output_filename, fmt="dense"):
+    """
+    Преобразует матрицу смежности в матрицу инцидентности и сохраняет
+    индекс графа рядом с выходным файлом.
+
+    Args:
+        input_filename (str): Имя файла с матрицей смежности.
+        output_filename (str): Имя файла для записи.
+        fmt (str): Формат вывода (см. Graf2.convert_adjacency_to_incidence).
+
+    Returns:
+        GraphIndex: Индекс графа для последующих запросов.
+
+    Raises:
+        ValueError: Если данные некорректны или формат неизвестен.
+    """
+    if fmt not in INCIDENCE_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    index = load_or_build_index(input_filename, output_filename)
+    write_incidence_from_index(output_filename, index, fmt)
+    # Выходной файл снова соответствует матрице смежности
+    if os.path.exists(delta_index_filename(output_filename)):
+        os.remove(delta_index_filename(output_filename))
+    return index
+
+
+def _copy(values, start, stop):
+    """
+    Возвращает копию отрезка массива индекса как array('q').
+    """
+    chunk = values[start:stop]
+    if isinstance(chunk, array):
+        return chunk
+    return array('q', chunk.tobytes())
+
+
+def _normalize_pairs(n, pairs):
+    """
+    Приводит пары вершин к виду (u, v), u < v, и проверяет их.
+
+    Raises:
+        ValueError: Если пара - петля, вершина вне графа или пара повторяется.
+    """
+    normalized = []
+    seen = set()
+    for u, v in pairs:
+        if u > v:
+            u, v = v, u
+        if u == v or u < 0 or v >= n:
+            raise ValueError(f"Некорректное ребро: {u} {v}")
+        if (u, v) in seen:
+            raise ValueError(f"Ребро повторяется в изменениях: {u} {v}")
+        seen.add((u, v))
+        normalized.append((u, v))
+    return normalized
+
+
+def _rebuild_csr(index, incident):
+    """
+    Собирает новый CSR: у вершин из incident - новые списки ребер,
+    у остальных - прежние отрезки indices (копируются целиком).
+    """
+    indptr = array('q', [0])
+    indices = array('q')
+    for w in range(index.n):
+        edges = incident.get(w)
+        if edges is None:
+            indices.extend(_copy(index.indices, index.indptr[w], index.indptr[w + 1]))
+        else:
+            indices.extend(edges)
+        indptr.append(len(indices))
+    return indptr, indices
+
+
+def _row_offsets(n, edge_u):
+    """
+    Возвращает номер первого ребра каждой строки (длина n + 1)
+    по меньшим концам ребер в каноническом порядке.
+    """
+    row_offsets = array('q', bytes(8 * (n + 1)))
+    for u in edge_u:
+        row_offsets[u + 1] += 1
+    for u in range(n):
+        row_offsets[u + 1] += row_offsets[u]
+    return row_offsets
+
+
+def _apply_canonical(index, added, removed_ids):
+    """
+    Изменяет индекс с сохранением канонической нумерации ребер.
+
+    Ребра с номерами меньше первого затронутого не меняются; хвост
+    (прежние ребра без удаленных и добавленные) сливается заново.
+    """
+    first = index.m
+    if removed_ids:
+        first = min(removed_ids)
+    for u, v in added:
+        position = bisect_left(index.edge_v, v, index.row_offsets[u], index.row_offsets[u + 1])
+        first = min(first, position)
+
+    tail = heapq.merge(((index.edge_u[e], index.edge_v[e]) for e in range(first, index.m)
+                        if e not in removed_ids), sorted(added))
+    edge_u = _copy(index.edge_u, 0, first)
+    edge_v = _copy(index.edge_v, 0, first)
+    incident = {}
+    for e in range(first, index.m):
+        for w in index.endpoints(e):
+            if w not in incident:
+                edges = _copy(index.indices, index.indptr[w], index.indptr[w + 1])
+                incident[w] = edges[:bisect_left(edges, first)]
+    for edge, (u, v) in enumerate(tail, first):
+        edge_u.append(u)
+        edge_v.append(v)
+        for w in (u, v):
+            if w not in incident:
+                edges = _copy(index.indices, index.indptr[w], index.indptr[w + 1])
+                incident[w] = edges[:bisect_left(edges, first)]
+            incident[w].append(edge)
+
+    row_offsets = _copy(index.row_offsets, 0, index.n + 1)
+    counts = {}
+    for e in removed_ids:
+        counts[index.edge_u[e]] = counts.get(index.edge_u[e], 0) - 1
+    for u, _ in added:
+        counts[u] = counts.get(u, 0) + 1
+    if counts:
+        shift = 0
+        for u in range(min(counts), index.n):
+            shift += counts.get(u, 0)
+            row_offsets[u + 1] += shift
+
+    indptr, indices = _rebuild_csr(index, incident)
+    new_index = GraphIndex(index.n, row_offsets, edge_u, edge_v, indptr, indices)
+    return new_index, range(first, new_index.m)
+
+
+def _apply_append_only(index, added, removed_ids):
+    """
+    Изменяет индекс без сохранения канонической нумерации: удаленное
+    ребро заменяется последним, новые ребра добавляются в конец.
+    """
+    edge_u = _copy(index.edge_u, 0, index.m)
+    edge_v = _copy(index.edge_v, 0, index.m)
+    changed = set()
+    incident = {}
+
+    def edges_of(w):
+        if w not in incident:
+            incident[w] = list(_copy(index.indices, index.indptr[w], index.indptr[w + 1]))
+        return incident[w]
+
+    canonical = index.canonical
+    # По убыванию номеров: последнее ребро к моменту замены не подлежит удалению
+    for e in sorted(removed_ids, reverse=True):
+        last = len(edge_u) - 1
+        for w in (edge_u[e], edge_v[e]):
+            edges_of(w).remove(e)
+        if e != last:
+            for w in (edge_u[last], edge_v[last]):
+                edges = edges_of(w)
+                edges[edges.index(last)] = e
+            edge_u[e], edge_v[e] = edge_u[last], edge_v[last]
+            changed.add(e)
+            canonical = False
+        changed.discard(last)
+        edge_u.pop()
+        edge_v.pop()
+
+    for u, v in sorted(added):
+        if edge_u and (edge_u[-1], edge_v[-1]) > (u, v):
+            canonical = False
+        edge = len(edge_u)
+        edge_u.append(u)
+        edge_v.append(v)
+        edges_of(u).append(edge)
+        edges_of(v).append(edge)
+        changed.add(edge)
+
+    for edges in incident.values():
+        edges.sort()
+    indptr, indices = _rebuild_csr(index, incident)
+    new_index = GraphIndex(index.n, _row_offsets(index.n, edge_u), edge_u, edge_v, indptr, indices,
+                           canonical)
+    return new_index, sorted(changed)
+
+
+def apply_edge_delta(index, added=(), removed=(), append_only=False):
+    """
+    Применяет к индексу добавление и удаление ребер.
+
+    В каноническом режиме нумерация ребер остается такой же, как
+    у build_incidence_matrix: номера ребер до первого затронутого
+    не меняются, а хвост сливается заново. Стоимость - O(n) на сборку
+    смещений и CSR (копирование отрезков) плюс O(длины хвоста).
+
+    В режиме только добавления удаленное ребро заменяется последним,
+    а новые ребра получают номера в конце, поэтому меняются только
+    столбцы, затронутые изменениями, но нумерация перестает быть
+    канонической (см. GraphIndex.canonical). Канонический режим
+    для такого индекса перенумеровывает все ребра.
+
+    Args:
+        index (GraphIndex): Текущий индекс (не изменяется).
+        added: Пары вершин добавляемых ребер.
+        removed: Пары вершин удаляемых ребер.
+        append_only (bool): Режим только добавления.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - index (GraphIndex): Новый индекс.
+            - changed (list): Номера столбцов матрицы инцидентности, которые
+              изменились или появились (столбцы за концом исчезли).
+
+    Raises:
+        ValueError: Если удаляемого ребра нет, добавляемое уже есть
+            или пара вершин некорректна.
+    """
+    n = index.n
+    removed = _normalize_pairs(n, removed)
+    added = _normalize_pairs(n, added)
+    removed_ids = set()
+    for u, v in removed:
+        edge = index.edge_id(u, v)
+        if edge is None:
+            raise ValueError(f"Ребра нет в графе: {u} {v}")
+        removed_ids.add(edge)
+    removed_pairs = set(removed)
+    for u, v in added:
+        if index.edge_id(u, v) is not None and (u, v) not in removed_pairs:
+            raise ValueError(f"Ребро уже есть в графе: {u} {v}")
+
+    if append_only:
+        return _apply_append_only(index, added, removed_ids)
+    if not index.canonical:
+        edges = sorted(set(zip(index.edge_u, index.edge_v)) - removed_pairs | set(added))
+        new_index = GraphIndex.from_edges(n, array('q', (u for u, _ in edges)),
+                                          array('q', (v for _, v in edges)))
+        return new_index, range(new_index.m)
+    return _apply_canonical(index, added, removed_ids)
+
+
+def update_incidence_file(old_filename, new_filename, index, changed):
+    """
+    Записывает полную матрицу инцидентности после изменения ребер,
+    копируя неизменившиеся столбцы из прежнего файла.
+
+    Каждая строка прежнего файла читается целиком, ее неизменившиеся
+    столбцы копируются байтами, а в изменившихся столбцах заново
+    ставятся единицы по индексу. Работа на строку - копирование O(m)
+    байт плюс O(len(changed)).
+
+    Args:
+        old_filename (str): Файл, записанный для индекса до изменений.
+        new_filename (str): Имя файла для записи (может совпадать с old_filename).
+        index (GraphIndex): Индекс после изменений.
+        changed: Изменившиеся столбцы (см. apply_edge_delta).
+
+    Raises:
+        ValueError: Если прежний файл некорректен.
+    """
+    n, m = index.n, index.m
+    ones = {}
+    for edge in changed:
+        for w in index.endpoints(edge):
+            ones.setdefault(w, []).append(edge)
+    zeros = [2 * edge for edge in changed]
+
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(new_filename)))
+    try:
+        # Дескриптор оборачивается первым, чтобы закрыться при ошибке открытия old_filename
+        with os.fdopen(descriptor, "wb") as new, open(old_filename, "rb") as old:
+            header = old.readline().split()
+            if len(header) != 2 or int(header[0]) != n:
+                raise ValueError("Некорректный заголовок файла")
+            old_m = int(header[1])
+            old_size = max(2 * old_m, 1)
+            keep = 2 * min(old_m, m)
+            line = bytearray(b"0 " * m) if m else bytearray(b" ")
+            template = bytes(line[keep:])
+            new.write(f"{n} {m}\n".encode())
+            for w in range(n):
+                row = old.read(old_size)
+                if len(row) != old_size or row[-1:] != b"\n":
+                    raise ValueError("Некорректный формат матрицы инцидентности")
+                line[:keep] = row[:keep]
+                line[keep:] = template
+                for position in zeros:
+                    line[position] = 48
+                for edge in ones.get(w, ()):
+                    line[2 * edge] = 49
+                line[-1] = 10
+                if 0 < keep < len(line):
+                    line[keep - 1] = 32
+                new.write(line)
+        os.replace(temporary, new_filename)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def apply_delta_to_output(output_filename, added=(), removed=(), append_only=False, fmt="dense"):
+    """
+    Обновляет выходной файл и индекс рядом с ним после изменения ребер.
+
+    Берется индекс предыдущего изменения, а если его нет - индекс,
+    построенный convert_adjacency_to_incidence_indexed. Новый индекс
+    сохраняется в отдельный файл (см. delta_index_filename), поэтому
+    кеш индекса матрицы смежности остается верным. Полная матрица
+    обновляется через update_incidence_file, разреженные форматы
+    записываются по новому индексу.
+
+    Args:
+        output_filename (str): Выходной файл, записанный вместе с индексом.
+        added: Пары вершин добавляемых ребер.
+        removed: Пары вершин удаляемых ребер.
+        append_only (bool): Режим только добавления (см. apply_edge_delta).
+        fmt (str): Формат выходного файла.
+
+    Returns:
+        GraphIndex: Новый индекс.
+
+    Raises:
+        FileNotFoundError: Если индекса или выходного файла нет.
+        ValueError: Если изменения некорректны или формат неизвестен.
+    """
+    if fmt not in INCIDENCE_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    previous = delta_index_filename(output_filename)
+    if not os.path.exists(previous):
+        previous = index_filename(output_filename)
+    index = load_graph_index(previous)
+    try:
+        new_index, changed = apply_edge_delta(index, added, removed, append_only)
+    finally:
+        index.close()
+    if fmt == "dense":
+        update_incidence_file(output_filename, output_filename, new_index, changed)
+    else:
+        write_incidence_from_index(output_filename, new_index, fmt)
+    new_index.save(delta_index_filename(output_filename))
+    return new_index
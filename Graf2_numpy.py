@@ -0,0 +1,483 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Graf2 import INCIDENCE_FORMATS, write_edge_list, write_incidence_coo, write_incidence_csr
+
+
+def _line_error(line, message):
+    """
+    Возвращает ValueError с номером строки файла (заголовок - строка 1).
+    """
+    return ValueError(f"Строка {line + 2} файла: {message}")
+
+
+def _parse_adjacency_tokens(n, data):
+    """
+    Разбирает строки матрицы смежности с произвольными пробелами.
+
+    Args:
+        n (int): Количество вершин в графе.
+        data (numpy.ndarray): Байты файла после строки заголовка (uint8).
+
+    Returns:
+        numpy.ndarray: Матрица n x n из 0 и 1 типа uint8.
+
+    Raises:
+        ValueError: Если количество строк или элементов в строке неверно
+            или элемент не 0 и не 1 (с номером строки и элемента).
+    """
+    newline = data == ord("\n")
+    space = newline | (data == ord(" ")) | (data == ord("\t")) | (data == ord("\r"))
+    # Номер строки каждого байта
+    lines = np.cumsum(newline) - newline
+    previous_space = np.concatenate(([True], space[:-1]))
+    next_space = np.concatenate((space[1:], [True]))
+    starts = np.flatnonzero(~space & previous_space)
+    ends = np.flatnonzero(~space & next_space) + 1
+    token_lines = lines[starts]
+
+    line_count = int(lines[-1]) + 1 if len(data) else 0
+    counts = np.bincount(token_lines, minlength=max(line_count, n))
+    bad = np.flatnonzero(counts[:n] != n)
+    if len(bad):
+        line = int(bad[0])
+        raise _line_error(line, f"количество элементов {counts[line]}, ожидалось {n}")
+    extra = np.flatnonzero(counts[n:])
+    if len(extra):
+        raise _line_error(n + int(extra[0]), "лишние данные после матрицы смежности")
+
+    values = data[starts].astype(np.int16) - ord("0")
+    bad = np.flatnonzero((ends - starts != 1) | (values < 0) | (values > 1))
+    if len(bad):
+        token = int(bad[0])
+        text = bytes(data[starts[token]:ends[token]]).decode(errors="replace")
+        raise _line_error(token // n, f"элемент {token % n} равен {text!r}, а не 0 или 1")
+    return values.astype(np.uint8).reshape(n, n)
+
+
+def _first_asymmetry(adjacency, block=256):
+    """
+    Находит первый по строкам элемент [i][j], i < j, не равный [j][i].
+
+    Матрица сравнивается с транспонированной полосами по block строк:
+    полоса строк i.. и полоса столбцов i.. помещаются в кеш, тогда как
+    сравнение adjacency != adjacency.T целиком обходит память с шагом n.
+
+    Returns:
+        tuple: Пара (i, j) или None, если матрица симметрична.
+    """
+    n = adjacency.shape[0]
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        rows = adjacency[start:stop, start:]
+        columns = adjacency[start:, start:stop].T
+        if not np.array_equal(rows, columns):
+            offsets_u, offsets_v = np.nonzero(np.triu(rows != columns, k=1))
+            if len(offsets_u):
+                return start + int(offsets_u[0]), start + int(offsets_v[0])
+    return None
+
+
+def parse_adjacency_bytes(content, validate=True):
+    """
+    Разбирает текст матрицы смежности целиком векторными операциями.
+
+    Если файл записан в обычном виде ("0 1 0\\n", один пробел между
+    элементами), строки матрицы - это срезы байтов с шагом 2, и разбор
+    сводится к нескольким проходам NumPy без поиска токенов. Иначе токены
+    находятся по границам пробельных символов, тоже без цикла по строкам.
+
+    Args:
+        content (bytes): Содержимое файла.
+        validate (bool): Проверять ли нулевую диагональ и симметричность.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - n (int): Количество вершин в графе.
+            - adjacency (numpy.ndarray): Матрица смежности n x n типа uint8.
+
+    Raises:
+        ValueError: Если данные некорректны; сообщение указывает строку
+            файла и элемент (вершины нумеруются с нуля).
+    """
+    header_end = content.find(b"\n")
+    if header_end < 0:
+        header_end = len(content)
+    try:
+        n = int(content[:header_end])
+    except ValueError:
+        raise ValueError("Строка 1 файла: некорректное количество вершин") from None
+    if n < 0:
+        raise ValueError("Строка 1 файла: некорректное количество вершин")
+    data = np.frombuffer(content, dtype=np.uint8, offset=min(header_end + 1, len(content)))
+
+    adjacency = None
+    # Обычный вид: n строк по 2n байт, цифры на четных позициях
+    if n and len(data) == 2 * n * n:
+        rows = data.reshape(n, 2 * n)
+        separators = rows[:, 1::2]
+        if (np.all(separators[:, :-1] == ord(" ")) and np.all(separators[:, -1] == ord("\n"))
+                and np.all((rows[:, 0::2] | 1) == ord("1"))):
+            adjacency = rows[:, 0::2] - np.uint8(ord("0"))
+    if adjacency is None:
+        adjacency = _parse_adjacency_tokens(n, data)
+
+    if validate:
+        loops = np.flatnonzero(np.diagonal(adjacency))
+        if len(loops):
+            i = int(loops[0])
+            raise _line_error(i, f"петля в вершине {i}: элемент [{i}][{i}] должен быть 0")
+        asymmetric = _first_asymmetry(adjacency)
+        if asymmetric is not None:
+            i, j = asymmetric
+            raise _line_error(i, f"матрица несимметрична: [{i}][{j}] = {adjacency[i, j]}, "
+                                 f"[{j}][{i}] = {adjacency[j, i]}")
+    return n, adjacency
+
+
+def read_adjacency_array(filename, validate=True):
+    """
+    Читает матрицу смежности из файла в массив NumPy.
+
+    Файл читается целиком одним вызовом и разбирается parse_adjacency_bytes.
+
+    Args:
+        filename (str): Имя файла, содержащего матрицу смежности.
+        validate (bool): Проверять ли нулевую диагональ и симметричность.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - n (int): Количество вершин в графе.
+            - adjacency (numpy.ndarray): Матрица смежности n x n типа uint8.
+
+    Raises:
+        FileNotFoundError: Если файл не существует.
+        ValueError: Если данные в файле некорректны (с указанием строки и элемента).
+    """
+    with open(filename, "rb") as file:
+        content = file.read()
+    return parse_adjacency_bytes(content, validate)
+
+
+def build_edge_arrays(adjacency):
+    """
+    Собирает ребра неориентированного графа из матрицы смежности.
+
+    Args:
+        adjacency (numpy.ndarray): Матрица смежности n x n.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - edge_u (numpy.ndarray): Меньшие концы ребер (int64).
+            - edge_v (numpy.ndarray): Большие концы ребер (int64).
+
+    Note:
+        np.flatnonzero перечисляет ненулевые элементы по строкам, поэтому
+        после отбора верхнего треугольника порядок ребер совпадает
+        с Graf2.build_edge_list. Копия треугольника (np.triu) не создается.
+    """
+    positions = np.flatnonzero(adjacency)
+    edge_u, edge_v = np.divmod(positions, adjacency.shape[1])
+    upper = edge_u < edge_v
+    return edge_u[upper].astype(np.int64), edge_v[upper].astype(np.int64)
+
+
+def build_incidence_matrix_numpy(adjacency):
+    """
+    Строит полную матрицу инцидентности векторными операциями.
+
+    Args:
+        adjacency (numpy.ndarray): Матрица смежности n x n.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - m (int): Количество ребер в графе.
+            - incidence (numpy.ndarray): Матрица инцидентности n x m типа uint8.
+    """
+    edge_u, edge_v = build_edge_arrays(adjacency)
+    m = len(edge_u)
+    incidence = np.zeros((adjacency.shape[0], m), dtype=np.uint8)
+    columns = np.arange(m)
+    incidence[edge_u, columns] = 1
+    incidence[edge_v, columns] = 1
+    return m, incidence
+
+
+# Количество вершин, начиная с которого построение распараллеливается
+PARALLEL_THRESHOLD = 2000
+
+
+def _block_edges(adjacency, start, stop):
+    """
+    Возвращает ребра (u, v), u < v, у которых u лежит в строках start..stop - 1.
+    """
+    block = adjacency[start:stop]
+    positions = np.flatnonzero(block)
+    edge_u, edge_v = np.divmod(positions, adjacency.shape[1])
+    edge_u += start
+    upper = edge_u < edge_v
+    return edge_u[upper], edge_v[upper]
+
+
+def _count_block_edges(adjacency_name, n, start, stop):
+    """
+    Считает ребра блока строк (выполняется в процессе пула).
+    """
+    memory = shared_memory.SharedMemory(name=adjacency_name)
+    try:
+        adjacency = np.ndarray((n, n), dtype=np.uint8, buffer=memory.buf)
+        count = len(_block_edges(adjacency, start, stop)[0])
+        del adjacency
+        return count
+    finally:
+        memory.close()
+
+
+def _fill_block_columns(adjacency_name, incidence_name, n, m, start, stop, offset):
+    """
+    Записывает столбцы ребер блока строк в общую матрицу инцидентности
+    (выполняется в процессе пула).
+    """
+    adjacency_memory = shared_memory.SharedMemory(name=adjacency_name)
+    incidence_memory = shared_memory.SharedMemory(name=incidence_name)
+    try:
+        adjacency = np.ndarray((n, n), dtype=np.uint8, buffer=adjacency_memory.buf)
+        incidence = np.ndarray((n, m), dtype=np.uint8, buffer=incidence_memory.buf)
+        edge_u, edge_v = _block_edges(adjacency, start, stop)
+        columns = np.arange(offset, offset + len(edge_u))
+        incidence[edge_u, columns] = 1
+        incidence[edge_v, columns] = 1
+        del adjacency, incidence
+    finally:
+        adjacency_memory.close()
+        incidence_memory.close()
+
+
+def _row_blocks(n, count):
+    """
+    Делит строки на count блоков с примерно равным числом клеток
+    верхнего треугольника (в первых строках их больше).
+    """
+    bounds = [0]
+    total = n * (n - 1) // 2
+    cells = 0
+    for i in range(n):
+        cells += n - 1 - i
+        if cells * count >= total * len(bounds) and len(bounds) < count:
+            bounds.append(i + 1)
+    if bounds[-1] != n:
+        bounds.append(n)
+    return list(zip(bounds, bounds[1:]))
+
+
+class SharedIncidence:
+    """
+    Полная матрица инцидентности, возвращаемая build_incidence_matrix_parallel.
+
+    При параллельном построении array - массив n x m поверх сегмента
+    multiprocessing.shared_memory, в который писали процессы: матрица
+    не копируется, поэтому пиковая память - одна матрица. После работы
+    нужно удалить ссылки на array и его срезы и вызвать close(), который
+    освобождает сегмент.
+    """
+    def __init__(self, array, memory=None):
+        """
+        Args:
+            array (numpy.ndarray): Матрица инцидентности n x m типа uint8.
+            memory (SharedMemory): Сегмент, в котором лежит array (None -
+                обычный массив).
+        """
+        self.array = array
+        self.memory = memory
+
+    def close(self):
+        """
+        Освобождает сегмент общей памяти.
+        """
+        self.array = None
+        if self.memory is not None:
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+
+
+def build_incidence_matrix_parallel(adjacency, workers=None, threshold=PARALLEL_THRESHOLD,
+                                    blocks_per_worker=4):
+    """
+    Строит полную матрицу инцидентности в пуле процессов.
+
+    Строки матрицы смежности делятся на блоки. Сначала процессы параллельно
+    считают ребра каждого блока; префиксные суммы дают номер первого ребра
+    блока, так что порядок ребер совпадает с build_incidence_matrix_numpy.
+    Затем процессы записывают столбцы своих ребер прямо в матрицу
+    инцидентности в multiprocessing.shared_memory: столбцы блоков
+    не пересекаются, а результаты не передаются через pickle.
+    Матрица смежности тоже передается через общую память.
+
+    Args:
+        adjacency (numpy.ndarray): Матрица смежности n x n.
+        workers (int): Количество процессов (по умолчанию - число ядер).
+        threshold (int): Наименьшее n для параллельного построения.
+        blocks_per_worker (int): Количество блоков строк на процесс.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - m (int): Количество ребер в графе.
+            - incidence (SharedIncidence): Матрица инцидентности n x m типа
+              uint8 в общей памяти (после работы - close()).
+    """
+    n = adjacency.shape[0]
+    workers = workers or os.cpu_count() or 1
+    if n < threshold or workers == 1:
+        m, incidence = build_incidence_matrix_numpy(adjacency)
+        return m, SharedIncidence(incidence)
+
+    blocks = _row_blocks(n, workers * blocks_per_worker)
+    adjacency_memory = shared_memory.SharedMemory(create=True, size=max(n * n, 1))
+    incidence_memory = None
+    try:
+        np.ndarray((n, n), dtype=np.uint8, buffer=adjacency_memory.buf)[:] = adjacency
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = list(executor.map(_count_block_edges, [adjacency_memory.name] * len(blocks),
+                                       [n] * len(blocks), *zip(*blocks)))
+            offsets = np.concatenate(([0], np.cumsum(counts)))
+            m = int(offsets[-1])
+
+            # Новый сегмент уже заполнен нулями
+            incidence_memory = shared_memory.SharedMemory(create=True, size=max(n * m, 1))
+            futures = [executor.submit(_fill_block_columns, adjacency_memory.name,
+                                       incidence_memory.name, n, m, start, stop, int(offset))
+                       for (start, stop), offset in zip(blocks, offsets)]
+            for future in futures:
+                future.result()
+    except BaseException:
+        if incidence_memory is not None:
+            incidence_memory.close()
+            incidence_memory.unlink()
+        raise
+    finally:
+        adjacency_memory.close()
+        adjacency_memory.unlink()
+    incidence = np.ndarray((n, m), dtype=np.uint8, buffer=incidence_memory.buf)
+    return m, SharedIncidence(incidence, incidence_memory)
+
+
+def build_incidence_coo_numpy(n, edge_u, edge_v):
+    """
+    Строит матрицу инцидентности в координатном формате (COO).
+
+    Args:
+        n (int): Количество вершин в графе.
+        edge_u (numpy.ndarray): Меньшие концы ребер.
+        edge_v (numpy.ndarray): Большие концы ребер.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - rows (numpy.ndarray): Номера строк (вершин) ненулевых элементов.
+            - cols (numpy.ndarray): Номера столбцов (ребер) ненулевых элементов.
+
+    Note:
+        Порядок элементов совпадает с Graf2.build_incidence_coo.
+    """
+    rows = np.column_stack((edge_u, edge_v)).ravel()
+    cols = np.repeat(np.arange(len(edge_u), dtype=np.int64), 2)
+    return rows, cols
+
+
+def build_incidence_csr_numpy(n, edge_u, edge_v):
+    """
+    Строит матрицу инцидентности в сжатом построчном формате (CSR).
+
+    Args:
+        n (int): Количество вершин в графе.
+        edge_u (numpy.ndarray): Меньшие концы ребер.
+        edge_v (numpy.ndarray): Большие концы ребер.
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - indptr (numpy.ndarray): Смещения строк, длина n + 1.
+            - indices (numpy.ndarray): Номера ребер по строкам, по возрастанию.
+
+    Note:
+        Устойчивая сортировка элементов COO по строкам сохраняет
+        возрастание номеров ребер внутри строки.
+    """
+    rows, cols = build_incidence_coo_numpy(n, edge_u, edge_v)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    indices = cols[np.argsort(rows, kind="stable")]
+    return indptr, indices
+
+
+def write_incidence_matrix_numpy(filename, n, m, incidence):
+    """
+    Записывает полную матрицу инцидентности в файл.
+
+    Вывод побайтно совпадает с Graf2.write_incidence_matrix: каждая
+    строка собирается в буфер uint8 (цифры через пробел) без создания
+    строки Python на каждый элемент.
+
+    Args:
+        filename (str): Имя файла для записи.
+        n (int): Количество вершин в графе.
+        m (int): Количество ребер в графе.
+        incidence (numpy.ndarray): Матрица инцидентности n x m из 0 и 1.
+
+    Raises:
+        IOError: Если возникла ошибка при записи в файл.
+    """
+    line = np.full(max(2 * m, 1), ord(" "), dtype=np.uint8)
+    line[-1] = ord("\n")
+    with open(filename, "wb") as f:
+        f.write(f"{n} {m}\n".encode())
+        for row in incidence:
+            np.add(row, ord("0"), out=line[0:2 * m:2], casting="unsafe")
+            f.write(line.tobytes())
+
+
+def convert_adjacency_to_incidence_numpy(input_filename, output_filename, fmt="dense", workers=1):
+    """
+    Преобразует файл с матрицей смежности в файл с матрицей инцидентности
+    векторными операциями NumPy.
+
+    Args:
+        input_filename (str): Имя файла с матрицей смежности.
+        output_filename (str): Имя файла для записи.
+        fmt (str): Формат вывода, как в Graf2.convert_adjacency_to_incidence.
+        workers (int): Количество процессов для полной матрицы
+            (None - число ядер, см. build_incidence_matrix_parallel).
+
+    Returns:
+        tuple: Кортеж из двух элементов:
+            - n (int): Количество вершин в графе.
+            - m (int): Количество ребер в графе.
+
+    Raises:
+        ValueError: Если данные некорректны или формат неизвестен.
+    """
+    if fmt not in INCIDENCE_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    n, adjacency = read_adjacency_array(input_filename)
+    if fmt == "dense":
+        m, incidence = build_incidence_matrix_parallel(adjacency, workers)
+        try:
+            write_incidence_matrix_numpy(output_filename, n, m, incidence.array)
+        finally:
+            incidence.close()
+        return n, m
+
+    edge_u, edge_v = build_edge_arrays(adjacency)
+    del adjacency
+    m = len(edge_u)
+    if fmt == "edges":
+        write_edge_list(output_filename, n, edge_u, edge_v)
+    elif fmt == "coo":
+        rows, cols = build_incidence_coo_numpy(n, edge_u, edge_v)
+        write_incidence_coo(output_filename, n, m, rows, cols)
+    else:
+        indptr, indices = build_incidence_csr_numpy(n, edge_u, edge_v)
+        write_incidence_csr(output_filename, n, m, indptr, indices)
+    return n, m
@@ -0,0 +1,53 @@
+import pytest
+
+from CalcTree2 import (build_expression_tree, evaluate_tree_iterative, fold_additions_file,
+                       remove_additions, remove_additions_fused, solve_problem, solve_problem_mmap,
+                       tree_to_rpn)
+
+# Выражения с числами со знаком и ведущими нулями ("+7", "-3", "007")
+SIGNED_EXPRESSIONS = [
+    "+7",
+    "007 1 -",
+    "+7 1 -",
+    "+7 -3 *",
+    "-3 +4 *",
+    "007 +2 + 5 *",
+    "+0 5 + 2 /",
+    "1 +2 + +3 *",
+    "-12 +12 + 4 -",
+    "+5 -5 * +0 + 3 +",
+]
+
+
+@pytest.mark.parametrize("expression", SIGNED_EXPRESSIONS)
+def test_signed_literals_equivalence(expression, tmp_path):
+    expected = remove_additions(build_expression_tree(expression))
+    expected_rpn = tree_to_rpn(expected)
+    expected_value = evaluate_tree_iterative(expected)
+
+    fused = remove_additions_fused(build_expression_tree(expression))
+    assert tree_to_rpn(fused) == expected_rpn
+    assert evaluate_tree_iterative(fused) == expected_value
+
+    input_filename = tmp_path / "input.txt"
+    output_filename = tmp_path / "output.txt"
+    input_filename.write_text(expression + "\n")
+    assert fold_additions_file(input_filename, output_filename) == expected_value
+    assert output_filename.read_text() == expected_rpn + "\n"
+
+    assert tree_to_rpn(solve_problem(input_filename)) == expected_rpn
+    assert tree_to_rpn(solve_problem_mmap(input_filename)) == expected_rpn
+
+
+def test_plus_literal_is_normalized():
+    assert tree_to_rpn(build_expression_tree("+7 007 -")) == "7 7 -"
+
+
+@pytest.mark.parametrize("expression", ["1_0 2 *", "0x1 2 +", " 1 2 + +-3 -", "1 2 ++"])
+def test_mmap_rejects_what_solve_problem_rejects(expression, tmp_path):
+    input_filename = tmp_path / "input.txt"
+    input_filename.write_text(expression + "\n")
+    with pytest.raises(ValueError, match="Неизвестная операция"):
+        solve_problem(input_filename)
+    with pytest.raises(ValueError, match="Неизвестная операция"):
+        solve_problem_mmap(input_filename)
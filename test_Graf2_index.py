@@ -0,0 +1,108 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from Graf2 import INCIDENCE_FORMATS, convert_adjacency_to_incidence, write_incidence_from_edges
+from Graf2_bench import generate_adjacency, write_adjacency_matrix
+from Graf2_index import (apply_delta_to_output, apply_edge_delta, build_graph_index,
+                         convert_adjacency_to_incidence_indexed, delta_index_filename,
+                         load_graph_index, update_incidence_file)
+
+
+def _upper_edges(adjacency):
+    rows, cols = np.nonzero(np.triu(adjacency, 1))
+    return {(int(u), int(v)) for u, v in zip(rows, cols)}
+
+
+def _adjacency_from_edges(n, edges):
+    adjacency = np.zeros((n, n), dtype=np.uint8)
+    for u, v in edges:
+        adjacency[u, v] = adjacency[v, u] = 1
+    return adjacency
+
+
+@pytest.mark.parametrize("append_only", [False, True])
+@pytest.mark.parametrize("seed", range(20))
+def test_random_deltas_match_fresh_conversion(seed, append_only, tmp_path):
+    rng = random.Random(seed)
+    n = rng.choice([1, 2, 3, 5, 12, 30])
+    fmt = rng.choice(INCIDENCE_FORMATS)
+    adjacency = generate_adjacency(n, rng.choice([0, 1, 3, 8]), seed)
+    input_filename = str(tmp_path / "input.txt")
+    output_filename = str(tmp_path / "output.txt")
+    expected_filename = str(tmp_path / "expected.txt")
+    write_adjacency_matrix(input_filename, adjacency)
+    convert_adjacency_to_incidence_indexed(input_filename, output_filename, fmt).close()
+
+    edges = _upper_edges(adjacency)
+    pairs = [(u, v) for u in range(n) for v in range(u + 1, n)]
+    for _ in range(4):
+        removed = rng.sample(sorted(edges), min(len(edges), rng.randint(0, 3)))
+        absent = [pair for pair in pairs if pair not in edges]
+        added = rng.sample(absent, min(len(absent), rng.randint(0, 3)))
+        added = [(v, u) if rng.random() < 0.5 else (u, v) for u, v in added]
+        index = apply_delta_to_output(output_filename, added, removed, append_only, fmt)
+        edges = (edges - set(removed)) | {(min(pair), max(pair)) for pair in added}
+
+        assert set(zip(index.edge_u, index.edge_v)) == edges
+        if index.canonical:
+            assert list(zip(index.edge_u, index.edge_v)) == sorted(edges)
+        for u, v in edges:
+            assert index.endpoints(index.edge_id(v, u)) == (u, v)
+        for w in range(n):
+            incident = list(index.incident_edges(w))
+            assert incident == sorted(e for e in range(index.m) if w in index.endpoints(e))
+
+        if append_only:
+            write_incidence_from_edges(expected_filename, n, index.edge_u, index.edge_v, fmt)
+        else:
+            write_adjacency_matrix(input_filename, _adjacency_from_edges(n, edges))
+            convert_adjacency_to_incidence(input_filename, expected_filename, fmt)
+        with open(output_filename, "rb") as actual, open(expected_filename, "rb") as expected:
+            assert actual.read() == expected.read()
+
+        saved = load_graph_index(delta_index_filename(output_filename))
+        try:
+            assert list(saved.edge_u) == list(index.edge_u)
+            assert list(saved.edge_v) == list(index.edge_v)
+            assert saved.canonical == index.canonical
+        finally:
+            saved.close()
+
+
+@pytest.mark.parametrize("fmt", INCIDENCE_FORMATS)
+def test_cached_index_is_reused(fmt, tmp_path):
+    input_filename = str(tmp_path / "input.txt")
+    output_filename = str(tmp_path / "output.txt")
+    expected_filename = str(tmp_path / "expected.txt")
+    write_adjacency_matrix(input_filename, generate_adjacency(12, 3, seed=3))
+    convert_adjacency_to_incidence(input_filename, expected_filename, fmt)
+    for _ in range(2):
+        convert_adjacency_to_incidence_indexed(input_filename, output_filename, fmt).close()
+        with open(output_filename, "rb") as actual, open(expected_filename, "rb") as expected:
+            assert actual.read() == expected.read()
+
+
+def test_delta_errors(tmp_path):
+    input_filename = str(tmp_path / "input.txt")
+    write_adjacency_matrix(input_filename, _adjacency_from_edges(3, [(0, 1)]))
+    index = build_graph_index(input_filename)
+    for added, removed in [((), [(1, 2)]), ([(1, 0)], ()), ([(1, 1)], ()), ([(0, 3)], ())]:
+        with pytest.raises(ValueError):
+            apply_edge_delta(index, added, removed)
+
+
+def test_update_incidence_file_missing_old_file(tmp_path):
+    input_filename = str(tmp_path / "input.txt")
+    write_adjacency_matrix(input_filename, generate_adjacency(4, 2, seed=0))
+    index = build_graph_index(input_filename)
+    descriptors = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else None
+
+    with pytest.raises(FileNotFoundError):
+        update_incidence_file(str(tmp_path / "missing.txt"), str(tmp_path / "new.txt"), index, [])
+
+    assert os.listdir(tmp_path) == ["input.txt"]
+    if descriptors is not None:
+        assert len(os.listdir("/proc/self/fd")) == descriptors
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from Graf2 import INCIDENCE_FORMATS, convert_adjacency_to_incidence
+from Graf2_bench import check_numpy_equivalence, generate_adjacency, write_adjacency_matrix
+from Graf2_numpy import (build_incidence_matrix_numpy, build_incidence_matrix_parallel,
+                         convert_adjacency_to_incidence_numpy)
+
+GRAPHS = {
+    "n0": np.zeros((0, 0), dtype=np.uint8),
+    "n1": np.zeros((1, 1), dtype=np.uint8),
+    "n2_edge": np.array([[0, 1], [1, 0]], dtype=np.uint8),
+    "n2_edgeless": np.zeros((2, 2), dtype=np.uint8),
+    "edgeless": np.zeros((7, 7), dtype=np.uint8),
+    "complete": (1 - np.eye(6, dtype=np.uint8)),
+    "random_10": generate_adjacency(10, 3, seed=1),
+    "random_200": generate_adjacency(200, 4, seed=2),
+}
+
+
+@pytest.mark.parametrize("fmt", INCIDENCE_FORMATS)
+@pytest.mark.parametrize("name", sorted(GRAPHS))
+def test_numpy_output_is_identical(name, fmt, tmp_path):
+    input_filename = tmp_path / "input.txt"
+    expected_filename = tmp_path / "expected.txt"
+    actual_filename = tmp_path / "actual.txt"
+    write_adjacency_matrix(input_filename, GRAPHS[name])
+
+    expected = convert_adjacency_to_incidence(input_filename, expected_filename, fmt)
+    actual = convert_adjacency_to_incidence_numpy(input_filename, actual_filename, fmt)
+    assert actual == expected
+    assert actual_filename.read_bytes() == expected_filename.read_bytes()
+
+
+def test_check_numpy_equivalence():
+    assert check_numpy_equivalence(sizes=(0, 1, 2, 3, 10, 50)) == []
+
+
+@pytest.mark.parametrize("name", ["n2_edge", "edgeless", "complete", "random_200"])
+def test_parallel_incidence_is_identical(name):
+    expected_m, expected = build_incidence_matrix_numpy(GRAPHS[name])
+    m, incidence = build_incidence_matrix_parallel(GRAPHS[name], workers=2, threshold=0)
+    try:
+        assert m == expected_m
+        assert np.array_equal(incidence.array, expected)
+    finally:
+        incidence.close()
+    assert incidence.memory is None